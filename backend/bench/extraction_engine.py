@@ -0,0 +1,48 @@
+"""process 추출 엔진 점검
+
+워커 프로세스에서 yt-dlp를 불러올 때만 드러나는 문제(모듈 이름 충돌, pickle 불가 예외 등)를 잡기 위해
+실제 워커 프로세스 풀에 추출 작업 하나를 보내 본다.
+네트워크가 없으면 추출 자체는 실패하지만, 워커 풀이 깨지지 않고(restarts=0)
+yt-dlp 오류가 ExtractionError로 전달되면 통과로 본다.
+
+    python bench/extraction_engine.py --video-id jNQXAC9IVRw
+"""
+import argparse
+import asyncio
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import upstream  # noqa: E402
+from ytdlp_worker import ExtractionError  # noqa: E402
+
+
+async def check(video_id):
+    engine = upstream.ProcessExtractionEngine(
+        name="ytdlp-check", max_workers=1, max_jobs_per_worker=0, timeout=60
+    )
+    try:
+        try:
+            info = await engine.extract(video_id)
+            print(f"extract: ok url={'yes' if info and info.get('url') else 'no'}")
+        except ExtractionError as e:
+            print(f"extract: yt-dlp error (worker pool intact): {e}")
+        stats = engine.stats()
+        print(f"engine: {stats}")
+        return stats["restarts"] == 0
+    finally:
+        engine.shutdown()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--video-id", default="jNQXAC9IVRw")
+    args = parser.parse_args()
+    ok = asyncio.run(check(args.video_id))
+    print("OK" if ok else "FAILED: worker pool restarted")
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,180 @@
+"""오프라인 부하 테스트
+
+ytmusicapi / yt-dlp를 로컬 대역(bench/standins.py)으로 바꾸고,
+ASGI 클라이언트로 모든 라우트를 지정한 동시성으로 호출한 뒤
+라우트별 p50/p95/p99 지연 시간, 처리량, 캐시 적중률을 출력한다. 네트워크가 필요 없다.
+
+    python bench/loadtest.py --concurrency 32 --requests 2000
+    python bench/loadtest.py --fixtures bench/fixtures --latency-ms 80 --extract-latency-ms 1500
+    python bench/loadtest.py --json result.json   # 결과를 파일로 저장해 변경 전후 비교
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import sys
+import time
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import httpx
+
+import standins
+
+QUERIES = ["아이유", "뉴진스", "bts", "blackpink", "lofi", "jazz", "아이브", "세븐틴", "day6", "taylor swift"]
+
+# (이름, 가중치, 요청 생성 함수)
+SCENARIO = [
+    ("search", 10, lambda ctx: ("GET", f"/api/search?q={ctx.query()}&limit=20", None)),
+    ("suggestions", 15, lambda ctx: ("GET", f"/api/search/suggestions?q={ctx.query()[:2]}", None)),
+    ("charts", 8, lambda ctx: ("GET", "/api/charts?limit=50", None)),
+    ("charts_list", 3, lambda ctx: ("GET", "/api/charts/list", None)),
+    ("featured", 3, lambda ctx: ("GET", "/api/playlists/featured", None)),
+    ("playlist", 6, lambda ctx: ("GET", f"/api/playlists/PLbench{ctx.random.randint(0, 20)}?limit=100", None)),
+    ("song", 30, lambda ctx: ("GET", f"/api/songs/{ctx.video_id()}", None)),
+    ("songs_batch", 2, lambda ctx: ("POST", "/api/songs/batch", {"videoIds": [ctx.video_id() for _ in range(10)]})),
+    ("lyrics", 8, lambda ctx: ("GET", f"/api/lyrics/MPLYt_{ctx.video_id()}", None)),
+    ("moods", 3, lambda ctx: ("GET", "/api/moods", None)),
+    ("mood_playlists", 4, lambda ctx: ("GET", f"/api/moods/playlists?params=mood{ctx.random.randint(0, 11)}", None)),
+]
+
+
+class Context:
+    def __init__(self, seed, song_pool):
+        self.random = random.Random(seed)
+        self.song_pool = song_pool
+
+    def query(self):
+        return self.random.choice(QUERIES)
+
+    def video_id(self):
+        # 인기곡에 요청이 몰리는 분포 (파레토)
+        index = min(int(self.random.paretovariate(1.2)) - 1, self.song_pool - 1)
+        return f"bench{index:06d}"
+
+
+def percentile(values, fraction):
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, int(round(fraction * (len(ordered) - 1))))
+    return ordered[index]
+
+
+async def run(args):
+    import main
+
+    names = [name for name, _, _ in SCENARIO]
+    weights = [weight for _, weight, _ in SCENARIO]
+    builders = {name: build for name, _, build in SCENARIO}
+    if args.routes:
+        selected = set(args.routes.split(","))
+        names, weights = zip(*[(n, w) for n, w in zip(names, weights) if n in selected])
+
+    latencies = {name: [] for name in names}
+    errors = {name: 0 for name in names}
+    remaining = [args.requests]
+
+    async def worker(client, worker_id):
+        ctx = Context(args.seed * 1000 + worker_id, args.song_pool)
+        while remaining[0] > 0:
+            remaining[0] -= 1
+            name = ctx.random.choices(names, weights)[0]
+            method, path, body = builders[name](ctx)
+            start = time.perf_counter()
+            try:
+                response = await client.request(method, path, json=body)
+                ok = response.status_code < 400
+            except Exception:
+                ok = False
+            latencies[name].append((time.perf_counter() - start) * 1000)
+            if not ok:
+                errors[name] += 1
+
+    transport = httpx.ASGITransport(app=main.app)
+    async with main.app.router.lifespan_context(main.app):
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=None) as client:
+            started = time.perf_counter()
+            await asyncio.gather(*[worker(client, i) for i in range(args.concurrency)])
+            elapsed = time.perf_counter() - started
+            cache_stats = (await client.get("/api/cache/stats")).json()
+
+    routes = {}
+    for name in names:
+        values = latencies[name]
+        routes[name] = {
+            "requests": len(values),
+            "errors": errors[name],
+            "p50": round(percentile(values, 0.50), 2),
+            "p95": round(percentile(values, 0.95), 2),
+            "p99": round(percentile(values, 0.99), 2),
+        }
+    total = sum(len(values) for values in latencies.values())
+    all_values = [value for values in latencies.values() for value in values]
+    return {
+        "config": vars(args),
+        "elapsedSeconds": round(elapsed, 3),
+        "requests": total,
+        "throughput": round(total / elapsed, 1) if elapsed else 0.0,
+        "overall": {
+            "p50": round(percentile(all_values, 0.50), 2),
+            "p95": round(percentile(all_values, 0.95), 2),
+            "p99": round(percentile(all_values, 0.99), 2),
+        },
+        "routes": routes,
+        "cache": cache_stats,
+        "upstreamCalls": standins.upstream_calls(),
+    }
+
+
+def print_report(result):
+    print(f"requests={result['requests']} elapsed={result['elapsedSeconds']}s throughput={result['throughput']} req/s")
+    print(f"{'route':<16}{'count':>8}{'errors':>8}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}")
+    for name, route in result["routes"].items():
+        print(f"{name:<16}{route['requests']:>8}{route['errors']:>8}{route['p50']:>10}{route['p95']:>10}{route['p99']:>10}")
+    overall = result["overall"]
+    print(f"{'(all)':<16}{result['requests']:>8}{'':>8}{overall['p50']:>10}{overall['p95']:>10}{overall['p99']:>10}")
+    print()
+    for name, stats in result["cache"].items():
+        if isinstance(stats, dict) and "hitRatio" in stats:
+            print(f"cache {name}: hitRatio={stats['hitRatio']} hits={stats['hits']} misses={stats['misses']}")
+        else:
+            print(f"{name}: {stats}")
+    print(f"upstream calls: {result['upstreamCalls']}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--concurrency", type=int, default=16, help="동시 클라이언트 수")
+    parser.add_argument("--requests", type=int, default=1000, help="전체 요청 수")
+    parser.add_argument("--latency-ms", type=float, default=50, help="ytmusicapi 호출 평균 지연")
+    parser.add_argument("--jitter-ms", type=float, default=20, help="지연 시간 지터 (±)")
+    parser.add_argument("--extract-latency-ms", type=float, default=800, help="yt-dlp 추출 평균 지연")
+    parser.add_argument("--extract-jitter-ms", type=float, default=300, help="yt-dlp 추출 지터 (±)")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="업스트림 오류 주입 비율 (0~1)")
+    parser.add_argument("--song-pool", type=int, default=500, help="요청할 곡 ID 개수")
+    parser.add_argument("--routes", help="실행할 라우트 (쉼표로 구분, 기본: 전체)")
+    parser.add_argument("--fixtures", help="녹화된 응답 디렉터리 (bench/record_fixtures.py로 생성)")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--json", help="결과를 JSON 파일로 저장")
+    args = parser.parse_args()
+
+    standins.install(
+        metadata_latency=standins.Latency(args.latency_ms, args.jitter_ms, args.error_rate, seed=args.seed),
+        extract_latency=standins.Latency(args.extract_latency_ms, args.extract_jitter_ms, args.error_rate, seed=args.seed + 1),
+        fixtures_dir=args.fixtures
+    )
+    os.chdir(BACKEND_DIR)
+
+    result = asyncio.run(run(args))
+    print_report(result)
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(result, f, ensure_ascii=False, indent=2)
+
+
+if __name__ == "__main__":
+    main()
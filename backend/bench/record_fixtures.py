@@ -0,0 +1,69 @@
+"""loadtest.py에서 재생할 업스트림 응답 녹화 (네트워크 필요)
+
+실제 YTMusic 클라이언트로 각 메서드를 한 번씩 호출해 <출력 디렉터리>/<메서드>.json에 저장한다.
+녹화한 디렉터리는 네트워크 없는 환경에서 --fixtures 옵션으로 재생할 수 있다.
+
+    python bench/record_fixtures.py --out bench/fixtures
+"""
+import argparse
+import json
+import os
+import sys
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+
+from ytmusicapi import YTMusic
+
+
+def _plain(value):
+    # LyricLine 같은 객체를 JSON으로 저장할 수 있게 변환
+    if isinstance(value, dict):
+        return {key: _plain(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_plain(item) for item in value]
+    if hasattr(value, "__dict__"):
+        return _plain(vars(value))
+    return value
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--out", default=os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures"))
+    parser.add_argument("--auth", default=os.path.join(BACKEND_DIR, "browser.json"))
+    parser.add_argument("--query", default="아이유")
+    args = parser.parse_args()
+
+    ytmusic = YTMusic(args.auth, language="ko")
+    charts = ytmusic.get_charts(country="KR")
+    chart_playlist_id = (charts.get("daily") or charts.get("weekly") or [{}])[0].get("playlistId")
+    search = ytmusic.search(args.query, filter="songs", limit=20, ignore_spelling=True)
+    video_id = search[0]["videoId"]
+    watch = ytmusic.get_watch_playlist(videoId=video_id)
+    moods = ytmusic.get_mood_categories()
+    mood_params = next(iter(moods.values()))[0]["params"]
+
+    recorded = {
+        "search": [search],
+        "get_search_suggestions": [ytmusic.get_search_suggestions(args.query, detailed_runs=False)],
+        "get_charts": [charts],
+        "get_playlist": [ytmusic.get_playlist(chart_playlist_id, limit=100)] if chart_playlist_id else [],
+        "get_home": [ytmusic.get_home(limit=50)],
+        "get_song": [ytmusic.get_song(video_id)],
+        "get_watch_playlist": [watch],
+        "get_lyrics": [ytmusic.get_lyrics(watch["lyrics"])] if watch.get("lyrics") else [],
+        "get_mood_categories": [moods],
+        "get_mood_playlists": [ytmusic.get_mood_playlists(mood_params)],
+    }
+
+    os.makedirs(args.out, exist_ok=True)
+    for method, responses in recorded.items():
+        if not responses:
+            continue
+        with open(os.path.join(args.out, f"{method}.json"), "w", encoding="utf-8") as f:
+            json.dump(_plain(responses), f, ensure_ascii=False)
+        print(f"recorded {method}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+"""목록 응답 직렬화 벤치마크 (네트워크 불필요)
+
+기존 방식(dict 생성 + FastAPI jsonable_encoder + JSONResponse)과
+Track + FastJSONResponse 방식의 요청당 CPU 시간을 비교한다.
+
+    python bench/serialization.py --tracks 100 --iterations 2000
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+
+from models import FastJSONResponse, track_from_item
+
+
+def make_items(count):
+    return [
+        {
+            "videoId": f"video{i:06d}",
+            "title": f"노래 제목 {i}",
+            "artists": [{"name": "아티스트", "id": "UC1"}, {"name": "Featuring", "id": "UC2"}],
+            "album": {"name": f"앨범 {i % 10}", "id": "MPRE"},
+            "thumbnails": [
+                {"url": f"https://lh3.googleusercontent.com/{i}=w60-h60", "width": 60, "height": 60},
+                {"url": f"https://lh3.googleusercontent.com/{i}=w120-h120", "width": 120, "height": 120},
+            ],
+            "duration": "3:45",
+            "duration_seconds": 225,
+            "isExplicit": False,
+        }
+        for i in range(count)
+    ]
+
+
+def legacy_response(items):
+    # 기존 라우트의 dict 생성 루프와 기본 응답 경로
+    tracks = []
+    for track in items:
+        track_thumbnail = ""
+        if track.get("thumbnails"):
+            track_thumbnail = track["thumbnails"][-1]["url"]
+        artists = []
+        if track.get("artists"):
+            artists = [artist["name"] for artist in track["artists"]]
+        album = ""
+        if track.get("album"):
+            album = track["album"]["name"]
+        tracks.append({
+            "id": track.get("videoId", ""),
+            "title": track.get("title", ""),
+            "artist": ", ".join(artists) if artists else "Unknown Artist",
+            "album": album or "Unknown Album",
+            "thumbnail": track_thumbnail,
+            "duration": track.get("duration", "0:00"),
+            "videoId": track.get("videoId", "")
+        })
+    return JSONResponse(jsonable_encoder({"results": tracks, "count": len(tracks)})).body
+
+
+def fast_response(items):
+    tracks = [track_from_item(item) for item in items]
+    return FastJSONResponse({"results": tracks, "count": len(tracks)}).body
+
+
+def measure(fn, items, iterations):
+    fn(items)  # 워밍업
+    start = time.process_time()
+    for _ in range(iterations):
+        fn(items)
+    return (time.process_time() - start) / iterations * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--tracks", type=int, default=100)
+    parser.add_argument("--iterations", type=int, default=2000)
+    args = parser.parse_args()
+
+    items = make_items(args.tracks)
+    legacy = measure(legacy_response, items, args.iterations)
+    fast = measure(fast_response, items, args.iterations)
+    print(f"tracks={args.tracks} iterations={args.iterations}")
+    print(f"legacy (dict + jsonable_encoder): {legacy:9.1f} us/request")
+    print(f"fast   (Track + FastJSONResponse): {fast:9.1f} us/request")
+    print(f"saved: {legacy - fast:.1f} us/request ({legacy / fast:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
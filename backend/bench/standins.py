@@ -0,0 +1,197 @@
+"""오프라인 벤치마크용 ytmusicapi / yt-dlp 대역
+
+install()을 main을 import하기 전에 호출하면 YTMusic과 YoutubeDL이 이 대역으로 바뀐다.
+fixtures 디렉터리에 <메서드 이름>.json(응답 목록)이 있으면 녹화된 응답을 돌려가며 재생하고,
+없으면 합성 응답을 만든다. 모든 호출에는 설정한 지연 시간과 지터가 더해진다.
+"""
+import json
+import os
+import random
+import threading
+import time
+
+import yt_dlp
+import ytmusicapi
+
+
+class Latency:
+    def __init__(self, mean_ms, jitter_ms, error_rate=0.0, seed=None):
+        self.mean_ms = mean_ms
+        self.jitter_ms = jitter_ms
+        self.error_rate = error_rate
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def wait(self, name):
+        with self._lock:
+            delay = max(0.0, self.mean_ms + self._random.uniform(-self.jitter_ms, self.jitter_ms))
+            fail = self._random.random() < self.error_rate
+        time.sleep(delay / 1000)
+        if fail:
+            raise RuntimeError(f"{name}: injected upstream error")
+
+
+class Fixtures:
+    """<디렉터리>/<메서드>.json 형식의 녹화된 응답"""
+
+    def __init__(self, directory):
+        self._responses = {}
+        self._cursor = {}
+        self._lock = threading.Lock()
+        if directory and os.path.isdir(directory):
+            for filename in os.listdir(directory):
+                if filename.endswith(".json"):
+                    with open(os.path.join(directory, filename), encoding="utf-8") as f:
+                        self._responses[filename[:-5]] = json.load(f)
+
+    def next(self, method):
+        responses = self._responses.get(method)
+        if not responses:
+            return None
+        with self._lock:
+            index = self._cursor.get(method, 0)
+            self._cursor[method] = index + 1
+        return responses[index % len(responses)]
+
+
+def _track(index):
+    return {
+        "videoId": f"bench{index:06d}",
+        "title": f"Bench Song {index}",
+        "artists": [{"name": "Bench Artist", "id": "UCbench"}],
+        "album": {"name": f"Bench Album {index % 50}", "id": "MPREbench"},
+        "thumbnails": [
+            {"url": f"https://example.invalid/{index}=w60", "width": 60, "height": 60},
+            {"url": f"https://example.invalid/{index}=w544", "width": 544, "height": 544},
+        ],
+        "duration": "3:30",
+        "duration_seconds": 210,
+    }
+
+
+class StandInYTMusic:
+    latency = Latency(0, 0)
+    fixtures = Fixtures(None)
+    calls = {}
+
+    def __init__(self, *args, **kwargs):
+        pass
+
+    def _call(self, method, synthetic):
+        StandInYTMusic.calls[method] = StandInYTMusic.calls.get(method, 0) + 1
+        self.latency.wait(method)
+        recorded = self.fixtures.next(method)
+        return recorded if recorded is not None else synthetic()
+
+    def search(self, query, filter=None, limit=20, ignore_spelling=False):
+        offset = sum(map(ord, query)) % 1000
+        return self._call("search", lambda: [_track(offset + i) for i in range(limit)])
+
+    def get_search_suggestions(self, query, detailed_runs=False):
+        return self._call("get_search_suggestions", lambda: [f"{query} {suffix}" for suffix in ("live", "remix", "lyrics")])
+
+    def get_charts(self, country="ZZ"):
+        return self._call("get_charts", lambda: {
+            "daily": [{"playlistId": f"PLdaily{country}", "title": "Daily Top 100", "thumbnails": [{"url": "https://example.invalid/daily"}]}],
+            "weekly": [{"playlistId": f"PLweekly{country}", "title": "Weekly Top 100", "thumbnails": [{"url": "https://example.invalid/weekly"}]}],
+            "videos": [{"playlistId": f"PLvideos{country}", "title": "Top Videos", "thumbnails": [{"url": "https://example.invalid/videos"}]}],
+        })
+
+    def get_playlist(self, playlist_id, limit=100, related=False, suggestions_limit=0):
+        count = 100 if limit is None else min(limit, 100)
+        return self._call("get_playlist", lambda: {
+            "id": playlist_id,
+            "title": f"Playlist {playlist_id}",
+            "description": "Bench playlist",
+            "thumbnails": [{"url": "https://example.invalid/playlist"}],
+            "trackCount": 100,
+            "tracks": [_track(i) for i in range(count)],
+        })
+
+    def get_home(self, limit=3):
+        return self._call("get_home", lambda: [{
+            "title": "맞춤 추천 뮤직 스테이션",
+            "contents": [
+                {"playlistId": f"PLhome{i}", "title": f"Station {i}", "description": "Bench", "thumbnails": [{"url": "https://example.invalid/home"}]}
+                for i in range(20)
+            ],
+        }])
+
+    def get_song(self, video_id, signature_timestamp=None):
+        return self._call("get_song", lambda: {"videoDetails": {
+            "videoId": video_id,
+            "title": f"Song {video_id}",
+            "author": "Bench Artist",
+            "lengthSeconds": "210",
+            "thumbnail": {"thumbnails": [{"url": f"https://example.invalid/{video_id}"}]},
+        }})
+
+    def get_watch_playlist(self, videoId=None, playlistId=None, limit=25, radio=False, shuffle=False):
+        return self._call("get_watch_playlist", lambda: {"tracks": [], "lyrics": f"MPLYt_{videoId}"})
+
+    def get_lyrics(self, browse_id, timestamps=False):
+        return self._call("get_lyrics", lambda: {
+            "lyrics": "\n".join(f"Bench lyric line {i}" for i in range(40)),
+            "source": "Source: Bench",
+            "hasTimestamps": False,
+        })
+
+    def get_mood_categories(self):
+        return self._call("get_mood_categories", lambda: {
+            "Moods & moments": [{"title": f"Mood {i}", "params": f"mood{i}"} for i in range(12)],
+            "Genres": [{"title": f"Genre {i}", "params": f"genre{i}"} for i in range(24)],
+        })
+
+    def get_mood_playlists(self, params):
+        return self._call("get_mood_playlists", lambda: [
+            {"playlistId": f"PL{params}{i}", "title": f"{params} {i}", "description": "", "thumbnails": [{"url": "https://example.invalid/mood"}], "count": "1,234 songs", "author": "YouTube Music"}
+            for i in range(10)
+        ])
+
+
+class StandInYoutubeDL:
+    latency = Latency(0, 0)
+    calls = 0
+    _lock = threading.Lock()
+
+    def __init__(self, params=None, *args, **kwargs):
+        self.params = params or {}
+
+    def extract_info(self, url, download=False, **kwargs):
+        with StandInYoutubeDL._lock:
+            StandInYoutubeDL.calls += 1
+        self.latency.wait("extract_info")
+        video_id = url.rsplit("v=", 1)[-1]
+        expire = int(time.time()) + 6 * 3600
+        return {
+            "id": video_id,
+            "url": f"https://rr1---sn-bench.googlevideo.com/videoplayback?expire={expire}&id={video_id}&itag=251",
+            "title": f"Song {video_id}",
+            "thumbnail": f"https://example.invalid/{video_id}",
+            "duration": 210,
+            "uploader": "Bench Artist",
+            "http_headers": {},
+        }
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+def install(metadata_latency, extract_latency, fixtures_dir=None):
+    """main을 import하기 전에 호출해야 한다"""
+    StandInYTMusic.latency = metadata_latency
+    StandInYTMusic.fixtures = Fixtures(fixtures_dir)
+    StandInYoutubeDL.latency = extract_latency
+    ytmusicapi.YTMusic = StandInYTMusic
+    yt_dlp.YoutubeDL = StandInYoutubeDL
+    # 워커 프로세스에는 대역이 적용되지 않으므로 스레드 엔진을 사용
+    os.environ["YTDLP_ENGINE"] = "thread"
+
+
+def upstream_calls():
+    calls = dict(StandInYTMusic.calls)
+    calls["extract_info"] = StandInYoutubeDL.calls
+    return calls
@@ -0,0 +1,57 @@
+"""콜드 스타트 측정
+
+새 프로세스에서 `import main`에 걸리는 시간을 여러 번 재고,
+import 시점에 yt_dlp / ytmusicapi를 불러오거나 클라이언트를 만들지 않는지 확인한다.
+준비 작업(플레이어 JS, 서명 캐시)은 서버 시작 후 /health/ready의 readyAfterSeconds로 확인한다.
+
+    python bench/startup.py --runs 5
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# 목표: 워커 하나가 요청을 받을 수 있게 되기까지 (import 완료) 1초 이내
+TARGET_IMPORT_SECONDS = 1.0
+
+PROBE = """
+import json, sys, time
+start = time.perf_counter()
+import main
+elapsed = time.perf_counter() - start
+print(json.dumps({
+    "seconds": elapsed,
+    "yt_dlp": "yt_dlp" in sys.modules,
+    "ytmusicapi": "ytmusicapi" in sys.modules,
+}))
+"""
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args()
+
+    results = []
+    for _ in range(args.runs):
+        output = subprocess.run(
+            [sys.executable, "-c", PROBE], cwd=BACKEND_DIR, capture_output=True, text=True, check=True
+        ).stdout
+        results.append(json.loads(output.strip().splitlines()[-1]))
+
+    seconds = [result["seconds"] for result in results]
+    median = statistics.median(seconds)
+    print(f"import main: median={median:.3f}s min={min(seconds):.3f}s max={max(seconds):.3f}s (runs={args.runs})")
+    print(f"yt_dlp imported at startup: {results[-1]['yt_dlp']}")
+    print(f"ytmusicapi imported at startup: {results[-1]['ytmusicapi']}")
+    status = "OK" if median <= TARGET_IMPORT_SECONDS else "SLOW"
+    print(f"target: <= {TARGET_IMPORT_SECONDS:.1f}s -> {status}")
+    sys.exit(0 if median <= TARGET_IMPORT_SECONDS else 1)
+
+
+if __name__ == "__main__":
+    main()
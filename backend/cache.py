@@ -0,0 +1,389 @@
+import asyncio
+import json
+import logging
+import sqlite3
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+from governor import INTERACTIVE, background_priority, current_priority, join_shared, run_shared, start_shared
+
+logger = logging.getLogger(__name__)
+
+
+class SingleFlight:
+    """같은 키에 대한 동시 호출을 하나의 실행으로 합친다.
+
+    진행 중인 호출이 있으면 새로 실행하지 않고 그 결과(또는 예외)를 함께 받는다.
+    합쳐진 호출은 기다리는 호출자 중 가장 높은 우선순위로 업스트림을 호출한다
+    (미리 받기가 시작한 조회에 사용자 요청이 합류하면 INTERACTIVE로 올라감).
+    negative_ttl이 주어지면 실패한 키는 그 시간 동안 바로 같은 예외를 돌려준다. 기억할 실패는
+    remember(예외)로 고르며, 백그라운드 우선순위로 끝난 실행의 실패는 기억하지 않는다.
+    """
+
+    def __init__(self, negative_ttl=0, remember=None):
+        self.negative_ttl = negative_ttl
+        self.remember = remember
+        self._inflight = {}
+        self._failures = {}  # key: (만료 시각, 예외)
+
+    async def do(self, key, fn):
+        failure = self._failures.get(key)
+        if failure is not None:
+            if failure[0] > time.monotonic():
+                raise failure[1]
+            self._failures.pop(key, None)
+
+        flight = self._inflight.get(key)
+        if flight is None:
+            priority = start_shared()
+            future = asyncio.ensure_future(run_shared(priority, self._run(key, fn)))
+            # 기다리던 요청이 모두 취소돼도 경고가 남지 않도록 결과를 소비
+            future.add_done_callback(lambda f: f.cancelled() or f.exception())
+            self._inflight[key] = (future, priority)
+        else:
+            future, priority = flight
+            join_shared(priority)
+        # 한 요청이 취소돼도 공유 실행은 계속되도록 shield
+        return await asyncio.shield(future)
+
+    def in_flight(self, key):
+        return key in self._inflight
+
+    async def _run(self, key, fn):
+        try:
+            return await fn()
+        except Exception as e:
+            if self.negative_ttl > 0 and self._should_remember(e):
+                self._remember_failure(key, e)
+            raise
+        finally:
+            self._inflight.pop(key, None)
+
+    def _should_remember(self, error):
+        if current_priority() != INTERACTIVE:
+            return False
+        return self.remember is None or self.remember(error)
+
+    def _remember_failure(self, key, error):
+        now = time.monotonic()
+        if len(self._failures) >= 1024:
+            for k in [k for k, (expires_at, _) in self._failures.items() if expires_at <= now]:
+                del self._failures[k]
+        self._failures[key] = (now + self.negative_ttl, error)
+
+
+class TTLCache:
+    """항목 수 상한과 항목별 만료 시각을 가진 LRU 캐시.
+
+    만료 시각은 epoch 초 단위이며, 가득 차면 가장 오래 쓰이지 않은 항목부터 밀어낸다.
+    """
+
+    def __init__(self, max_entries, default_ttl, store=None, namespace="default"):
+        self.max_entries = max_entries
+        self.default_ttl = default_ttl
+        # 선택적인 영구 저장소 (PersistentStore) - 메모리 미스 시 조회, 저장 시 함께 기록
+        self.store = store
+        self.namespace = namespace
+        self._data = OrderedDict()  # key: (만료 시각, 값)
+        self.hits = 0
+        self.misses = 0
+        self.store_hits = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def __len__(self):
+        return len(self._data)
+
+    def __contains__(self, key):
+        return self.peek(key) is not None
+
+    def get(self, key):
+        """메모리에서만 조회 - 영구 저장소까지 보려면 load()"""
+        entry = self._lookup(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return entry[1]
+
+    async def load(self, key):
+        """get()과 같지만 메모리에 없으면 영구 저장소를 조회한다 (저장소 스레드의 결과를 기다림)"""
+        entry = self._lookup(key)
+        if entry is None and self.store is not None:
+            stored = await self.store.get(self.namespace, key)
+            # 기다리는 동안 새 값이 저장됐으면 그 값을 쓴다
+            entry = self._lookup(key)
+            if entry is None and stored is not None:
+                self._insert(key, stored[1], stored[0])
+                self.store_hits += 1
+                entry = stored
+        if entry is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return entry[1]
+
+    def _lookup(self, key):
+        entry = self._data.get(key)
+        if entry is None:
+            return None
+        if entry[0] <= time.time():
+            del self._data[key]
+            self.expirations += 1
+            return None
+        self._data.move_to_end(key)
+        return entry
+
+    def peek(self, key):
+        """통계와 LRU 순서에 영향을 주지 않고 조회"""
+        entry = self._data.get(key)
+        if entry is None or entry[0] <= time.time():
+            return None
+        return entry[1]
+
+    def expires_at(self, key):
+        entry = self._data.get(key)
+        return entry[0] if entry is not None else None
+
+    def set(self, key, value, expires_at=None):
+        if expires_at is None:
+            expires_at = time.time() + self.default_ttl
+        self._insert(key, value, expires_at)
+        if self.store is not None:
+            self.store.set(self.namespace, key, value, expires_at)
+
+    def _insert(self, key, value, expires_at):
+        self._data[key] = (expires_at, value)
+        self._data.move_to_end(key)
+        while len(self._data) > self.max_entries:
+            self._data.popitem(last=False)
+            self.evictions += 1
+
+    def pop(self, key, default=None):
+        entry = self._data.pop(key, None)
+        if self.store is not None:
+            self.store.delete(self.namespace, key)
+        return entry[1] if entry is not None else default
+
+    def purge_expired(self):
+        now = time.time()
+        expired = [key for key, (expires_at, _) in self._data.items() if expires_at <= now]
+        for key in expired:
+            del self._data[key]
+        self.expirations += len(expired)
+        if self.store is not None:
+            self.store.purge_expired(self.namespace)
+        return len(expired)
+
+    async def run_purger(self, interval):
+        """만료된 항목을 주기적으로 정리 (백그라운드 태스크로 실행)"""
+        while True:
+            await asyncio.sleep(interval)
+            self.purge_expired()
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._data),
+            "maxEntries": self.max_entries,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hitRatio": round(self.hits / lookups, 4) if lookups else 0.0,
+            "storeHits": self.store_hits,
+            "storeBusy": self.store.busy if self.store is not None else 0,
+            "storePending": self.store.pending if self.store is not None else 0,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+        }
+
+
+class PersistentStore:
+    """SQLite(WAL) 기반 영구 캐시 저장소.
+
+    여러 uvicorn 워커가 같은 파일을 읽고 쓰며, 재시작 후에도 만료 시각이 유지된다.
+    값은 JSON으로 직렬화할 수 있어야 한다.
+
+    SQLite 호출은 이벤트 루프를 막지 않도록 전용 스레드 하나에서 순서대로 실행한다.
+    읽기(get)는 그 결과를 기다리고, 쓰기/삭제는 대기열에 넣기만 하고 바로 돌아온다 (write-behind).
+    한 스레드에서 순서대로 실행하므로 대기열에 있는 쓰기 뒤의 읽기는 그 쓰기를 본다.
+    다른 워커가 쓰는 중이면 busy_timeout(ms)만 기다린 뒤 읽기는 미스로, 쓰기/삭제는 건너뛴다
+    (busy 횟수로 집계).
+    """
+
+    def __init__(self, path, busy_timeout=50):
+        self.path = path
+        self.busy = 0
+        # 대기열에 넣은/처리한 쓰기 수 - 각각 한 스레드에서만 바꾼다 (이벤트 루프, 저장소 스레드)
+        self._submitted = 0
+        self._written = 0
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="cache-store")
+        # 스키마 준비는 시작 시 한 번이므로 충분히 기다리고, 이후에는 짧은 대기 시간을 쓴다
+        self._conn = sqlite3.connect(path, timeout=5, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS cache ("
+            " namespace TEXT NOT NULL,"
+            " key TEXT NOT NULL,"
+            " value TEXT NOT NULL,"
+            " expires_at REAL NOT NULL,"
+            " PRIMARY KEY (namespace, key))"
+        )
+        self._conn.execute(f"PRAGMA busy_timeout = {int(busy_timeout)}")
+
+    def _execute(self, sql, params):
+        """저장소 스레드에서 실행. 잠금 대기 시간을 넘기면 None (다른 워커가 쓰는 중)"""
+        try:
+            return self._conn.execute(sql, params).fetchone()
+        except sqlite3.OperationalError as e:
+            if "locked" not in str(e) and "busy" not in str(e):
+                raise
+            self.busy += 1
+            logger.debug("영구 캐시 사용 중 - 건너뜀: %s", e)
+            return None
+
+    def _write(self, sql, params):
+        try:
+            self._execute(sql, params)
+        except Exception:
+            logger.exception("영구 캐시 쓰기 실패")
+        finally:
+            self._written += 1
+
+    def _submit_write(self, sql, params):
+        try:
+            self._executor.submit(self._write, sql, params)
+        except RuntimeError:
+            # 종료 중(close 이후) - 버린다
+            return
+        self._submitted += 1
+
+    @property
+    def pending(self):
+        """대기열에 있는 쓰기/삭제 수"""
+        return self._submitted - self._written
+
+    async def get(self, namespace, key):
+        """(만료 시각, 값)을 반환, 없거나 만료됐으면 None"""
+        row = await asyncio.get_running_loop().run_in_executor(
+            self._executor,
+            self._execute,
+            "SELECT expires_at, value FROM cache WHERE namespace = ? AND key = ? AND expires_at > ?",
+            (namespace, key, time.time())
+        )
+        if row is None:
+            return None
+        return row[0], json.loads(row[1])
+
+    def set(self, namespace, key, value, expires_at):
+        # 직렬화는 호출한 시점의 값으로 (이후 값이 바뀌어도 영향 없음)
+        data = json.dumps(value, ensure_ascii=False)
+        self._submit_write(
+            "INSERT OR REPLACE INTO cache (namespace, key, value, expires_at) VALUES (?, ?, ?, ?)",
+            (namespace, key, data, expires_at)
+        )
+
+    def delete(self, namespace, key):
+        self._submit_write("DELETE FROM cache WHERE namespace = ? AND key = ?", (namespace, key))
+
+    def purge_expired(self, namespace):
+        self._submit_write("DELETE FROM cache WHERE namespace = ? AND expires_at <= ?", (namespace, time.time()))
+
+    def close(self):
+        """대기열의 쓰기를 마친 뒤 연결을 닫는다"""
+        self._executor.shutdown(wait=True)
+        self._conn.close()
+
+
+class ResponseCache:
+    """stale-while-revalidate 방식의 응답 캐시.
+
+    - TTL 이내: 캐시된 값을 그대로 반환
+    - TTL 초과 ~ TTL + max_stale: 캐시된 값을 바로 반환하고 백그라운드에서 갱신
+    - 그 이후 또는 값이 없으면: 갱신을 기다림 (실패하면 마지막 정상 값을 반환)
+    같은 키의 동시 갱신은 하나로 합쳐진다.
+    """
+
+    def __init__(self, max_entries, max_stale):
+        self.max_entries = max_entries
+        self.max_stale = max_stale
+        self._data = OrderedDict()  # key: (갱신 시각, 값)
+        self._flight = SingleFlight()
+        self._refreshes = set()
+        self.hits = 0
+        self.stale_hits = 0
+        self.misses = 0
+        self.refresh_errors = 0
+
+    async def get(self, key, ttl, loader):
+        entry = self._data.get(key)
+        if entry is not None:
+            self._data.move_to_end(key)
+            age = time.monotonic() - entry[0]
+            if age < ttl:
+                self.hits += 1
+                return entry[1]
+            if age < ttl + self.max_stale:
+                self.stale_hits += 1
+                self._refresh_in_background(key, loader)
+                return entry[1]
+
+        self.misses += 1
+        try:
+            return await self._flight.do(key, lambda: self._load(key, loader))
+        except Exception:
+            if entry is None:
+                raise
+            # 업스트림 실패 시 마지막 정상 값으로 대체
+            self.refresh_errors += 1
+            logger.exception("응답 캐시 갱신 실패, 마지막 정상 값 사용: %s", key)
+            return entry[1]
+
+    def peek(self, key):
+        """만료 여부와 관계없이 캐시된 값을 반환 (없으면 None)"""
+        entry = self._data.get(key)
+        return entry[1] if entry is not None else None
+
+    def refresh(self, key, loader):
+        """값을 기다리지 않고 백그라운드에서 불러오기 시작 (진행 중이면 무시)"""
+        self._refresh_in_background(key, loader)
+
+    def invalidate(self, key):
+        self._data.pop(key, None)
+
+    def set(self, key, value):
+        """loader를 거치지 않고 만든 값을 저장 (지금 갱신한 것으로 봄)"""
+        self._data[key] = (time.monotonic(), value)
+        self._data.move_to_end(key)
+        while len(self._data) > self.max_entries:
+            self._data.popitem(last=False)
+
+    async def _load(self, key, loader):
+        value = await loader()
+        self.set(key, value)
+        return value
+
+    def _refresh_in_background(self, key, loader):
+        if self._flight.in_flight(key):
+            return
+        # 백그라운드 갱신은 사용자 요청보다 낮은 우선순위로 업스트림 호출
+        with background_priority():
+            task = asyncio.ensure_future(self._flight.do(key, lambda: self._load(key, loader)))
+        self._refreshes.add(task)
+        task.add_done_callback(self._on_refresh_done)
+
+    def _on_refresh_done(self, task):
+        self._refreshes.discard(task)
+        if not task.cancelled() and task.exception() is not None:
+            self.refresh_errors += 1
+            logger.error("응답 캐시 백그라운드 갱신 실패", exc_info=task.exception())
+
+    def stats(self):
+        return {
+            "size": len(self._data),
+            "hits": self.hits,
+            "staleHits": self.stale_hits,
+            "misses": self.misses,
+            "refreshErrors": self.refresh_errors,
+        }
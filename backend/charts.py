@@ -0,0 +1,235 @@
+# 차트 스냅샷 - 국가별 차트를 주기적으로 미리 받아 두고, 차트 라우트는 현재 스냅샷만 읽는다
+import asyncio
+import dataclasses
+import hashlib
+import logging
+import time
+from dataclasses import dataclass
+
+from governor import background_priority, join_shared, run_shared, start_shared
+from models import Track, dumps, stable_id, thumbnail_url, track_from_item
+from upstream import call_ytmusic
+
+logger = logging.getLogger(__name__)
+
+CHART_PLAYLIST_LIMIT = 50
+
+# /api/charts/list에 포함할 차트 카테고리
+CHART_CATEGORIES = ["videos", "artists", "daily", "weekly", "trending"]
+
+# 차트 목록이 비었을 때 사용하는 기본 차트 (한국 인기곡 Top 100)
+FALLBACK_CHARTS = {
+    "KR": {
+        "id": 1,
+        "title": "한국 인기곡 Top 100",
+        "country": "KR",
+        "thumbnail": "https://music.youtube.com/img/trending/trending_1.png",
+        "songs": 100,
+        "playlistId": "PL4fGSI1pDJn6jXS_Ix_YyccC20CsxbklJ"
+    }
+}
+
+
+@dataclass(slots=True)
+class ChartSnapshot:
+    """한 국가의 차트 스냅샷. 내용이 바뀔 때마다 version이 1씩 증가한다"""
+    country: str
+    version: int
+    fingerprint: str
+    updatedAt: float  # 내용이 마지막으로 바뀐 시각
+    refreshedAt: float  # 마지막으로 업스트림에서 확인한 시각
+    songs: list  # /api/charts 곡 목록 (Track)
+    charts: list  # /api/charts/list 항목
+
+    def to_dict(self):
+        return dataclasses.asdict(self)
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls(**{**data, "songs": [Track(**song) for song in data["songs"]]})
+
+
+def chart_playlist_id(charts):
+    """곡 목록으로 쓸 차트 플레이리스트 - daily 차트 우선, 없으면 weekly"""
+    for category in ("daily", "weekly"):
+        if charts and charts.get(category):
+            return charts[category][0].get("playlistId")
+    return None
+
+
+def chart_list(charts, country):
+    # charts는 {'countries': {...}, 'global': {...}, 'videos': {...}, 'artists': {...}} 형태일 수 있음
+    # 또는 바로 리스트일 수도 있음 (ytmusicapi 버전에 따라 다름)
+    results = []
+    for category in CHART_CATEGORIES:
+        items = charts.get(category) if charts else None
+        if not isinstance(items, list):
+            continue
+        for item in items:
+            # playlistId가 있는 항목만 처리 (재생 가능한 차트)
+            if "playlistId" not in item:
+                continue
+            results.append({
+                "id": stable_id(item["playlistId"]),
+                "title": item.get("title", f"Top Chart ({category})"),
+                "country": country,
+                "thumbnail": thumbnail_url(item),
+                "songs": 100,  # 대략적인 수치
+                "playlistId": item.get("playlistId"),
+                "params": item.get("params")
+            })
+
+    # 결과가 없으면 기본 차트로 구성 (Fallback)
+    if not results and country in FALLBACK_CHARTS:
+        results.append(FALLBACK_CHARTS[country])
+    return results
+
+
+async def build_chart(country):
+    """업스트림에서 (곡 목록, 차트 목록)을 받아 온다"""
+    charts = await call_ytmusic("get_charts", country=country)
+    songs = []
+    playlist_id = chart_playlist_id(charts)
+    if playlist_id:
+        playlist = await call_ytmusic("get_playlist", playlist_id, limit=CHART_PLAYLIST_LIMIT)
+        songs = [track_from_item(track, default_album="Chart") for track in playlist.get("tracks") or []]
+    return songs, chart_list(charts, country)
+
+
+class ChartScheduler:
+    """countries의 차트 스냅샷을 interval초마다 백그라운드에서 갱신한다.
+
+    라우트는 get()으로 현재 스냅샷만 읽으므로 요청 경로에서 업스트림을 호출하지 않는다.
+    (시작 직후 첫 스냅샷이 만들어지기 전의 요청만 그 완료를 기다린다.)
+    갱신에 실패하면 이전 스냅샷을 계속 사용한다.
+    store가 있으면 스냅샷을 저장해 재시작 직후에도 바로 응답하고,
+    다른 워커가 최근에 갱신한 스냅샷은 업스트림 호출 없이 가져다 쓴다.
+    """
+
+    namespace = "charts"
+
+    def __init__(self, countries, interval, build=build_chart, store=None, max_stale=86400):
+        self.countries = list(countries)
+        self.interval = interval
+        self.build = build
+        self.store = store
+        self.max_stale = max_stale
+        self._snapshots = {}
+        self._loading = {}
+        self._task = None
+        self.refreshes = 0
+        self.failures = 0
+        self.shared = 0
+
+    async def start(self):
+        for country in self.countries:
+            snapshot = await self._load_shared(country)
+            if snapshot is not None:
+                self._snapshots[country] = snapshot
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+    async def _run(self):
+        while True:
+            await self.refresh_all()
+            await asyncio.sleep(self.interval)
+
+    async def refresh_all(self):
+        with background_priority():
+            await asyncio.gather(*(self._refresh_logged(country) for country in self.countries))
+
+    async def _refresh_logged(self, country):
+        try:
+            await self.refresh(country)
+        except Exception as e:
+            logger.warning("차트 스냅샷 갱신 실패 (%s): %r", country, e)
+
+    def _is_fresh(self, snapshot):
+        return snapshot is not None and time.time() - snapshot.refreshedAt < self.interval
+
+    async def _load_shared(self, country):
+        if self.store is None:
+            return None
+        entry = await self.store.get(self.namespace, country)
+        if entry is None:
+            return None
+        return ChartSnapshot.from_dict(entry[1])
+
+    async def refresh(self, country, force=False):
+        """스냅샷을 갱신한다. 같은 국가의 갱신이 진행 중이면 그 결과를 함께 기다린다"""
+        current = self._snapshots.get(country)
+        if not force and self._is_fresh(current):
+            return current
+        loading = self._loading.get(country)
+        if loading is None:
+            # 주기적 갱신 중에 사용자 요청이 합류하면 갱신의 업스트림 호출도 사용자 요청 우선순위로 올린다
+            priority = start_shared()
+            task = asyncio.ensure_future(run_shared(priority, self._refresh(country)))
+            self._loading[country] = (task, priority)
+            task.add_done_callback(lambda _: self._loading.pop(country, None))
+        else:
+            task, priority = loading
+            join_shared(priority)
+        return await asyncio.shield(task)
+
+    async def _refresh(self, country):
+        current = self._snapshots.get(country)
+
+        # 다른 워커가 최근에 갱신했으면 그대로 사용
+        shared = await self._load_shared(country)
+        if self._is_fresh(shared) and (current is None or shared.refreshedAt > current.refreshedAt):
+            self._snapshots[country] = shared
+            self.shared += 1
+            return shared
+
+        try:
+            songs, charts = await self.build(country)
+        except Exception:
+            self.failures += 1
+            raise
+        self.refreshes += 1
+
+        now = time.time()
+        fingerprint = hashlib.blake2b(dumps({"songs": songs, "charts": charts}), digest_size=16).hexdigest()
+        current = self._snapshots.get(country)
+        if current is not None and current.fingerprint == fingerprint:
+            current.refreshedAt = now
+            snapshot = current
+        else:
+            version = current.version + 1 if current is not None else 1
+            snapshot = ChartSnapshot(country, version, fingerprint, now, now, songs, charts)
+            self._snapshots[country] = snapshot
+        if self.store is not None:
+            self.store.set(self.namespace, country, snapshot.to_dict(), now + self.max_stale)
+        return snapshot
+
+    async def get(self, country):
+        """현재 스냅샷. 설정되지 않은 국가면 KeyError"""
+        snapshot = self._snapshots.get(country)
+        if snapshot is not None:
+            return snapshot
+        if country not in self.countries:
+            raise KeyError(country)
+        # 첫 스냅샷이 아직 없으면 만들어질 때까지 기다린다
+        return await self.refresh(country, force=True)
+
+    def stats(self):
+        now = time.time()
+        return {
+            "refreshes": self.refreshes,
+            "failures": self.failures,
+            "shared": self.shared,
+            "countries": {
+                country: {
+                    "version": snapshot.version,
+                    "songs": len(snapshot.songs),
+                    "charts": len(snapshot.charts),
+                    "ageSeconds": round(now - snapshot.refreshedAt, 1),
+                }
+                for country, snapshot in self._snapshots.items()
+            },
+        }
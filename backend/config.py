@@ -0,0 +1,163 @@
+import os
+import sys
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+
+def _env_bool(name, default):
+    value = os.getenv(name)
+    if value is None or value.strip() == "":
+        return default
+    return value.strip().lower() in ("1", "true", "yes", "on")
+
+
+def _env_int(name, default):
+    value = os.getenv(name)
+    if value is None or value.strip() == "":
+        return default
+    return int(value)
+
+
+# 서버 설정
+HOST = os.getenv("HOST", "0.0.0.0")
+PORT = _env_int("PORT", 8000)
+# production이면 python main.py가 reload 없이 여러 워커로 실행 (--prod 옵션과 같음)
+APP_ENV = os.getenv("APP_ENV", "development").strip().lower()
+PRODUCTION = APP_ENV == "production" or "--prod" in sys.argv
+# production 모드의 uvicorn 워커 프로세스 수
+WEB_CONCURRENCY = _env_int("WEB_CONCURRENCY", os.cpu_count() or 1)
+
+# 시작 시 준비 작업 (클라이언트 생성, 추출 워커 기동, 플레이어 JS/서명 캐시 채우기)
+# 끝나기 전까지 /health/ready는 503을 반환
+WARMUP_ENABLED = _env_bool("WARMUP_ENABLED", True)
+# 준비 작업에서 한 번 추출해 볼 영상 (비우면 추출하지 않음)
+WARMUP_VIDEO_ID = os.getenv("WARMUP_VIDEO_ID", "jNQXAC9IVRw")
+
+# 업스트림 실행 풀 크기
+# ytmusicapi 메타데이터 호출은 가볍고 많으므로 넉넉하게,
+# yt-dlp 추출은 무겁기 때문에 별도 풀로 분리해서 검색 등을 굶기지 않도록 한다
+YTMUSIC_WORKERS = _env_int("YTMUSIC_WORKERS", 16)
+# production 모드에서는 워커마다 추출 풀이 생기므로 기본값은 코어를 워커 수로 나눈 값
+# (전체 추출 프로세스 수가 코어 수를 넘지 않도록)
+YTDLP_WORKERS = _env_int(
+    "YTDLP_WORKERS", max(1, (os.cpu_count() or 1) // WEB_CONCURRENCY) if PRODUCTION else 4
+)
+
+# yt-dlp 추출 엔진: process (워커 프로세스 풀, 코어 수만큼 확장) 또는 thread
+YTDLP_ENGINE = os.getenv("YTDLP_ENGINE", "process").strip().lower()
+# 작업 하나의 제한 시간 (초)
+YTDLP_JOB_TIMEOUT = _env_int("YTDLP_JOB_TIMEOUT", 30)
+# 워커 프로세스를 교체하기 전까지 처리할 작업 수 (0이면 교체하지 않음)
+YTDLP_MAX_JOBS_PER_WORKER = _env_int("YTDLP_MAX_JOBS_PER_WORKER", 200)
+
+# 스트림 추출 실패를 기억하는 시간 (초) - 깨진 영상에 재시도가 몰리지 않도록
+NEGATIVE_CACHE_SECONDS = _env_int("NEGATIVE_CACHE_SECONDS", 30)
+
+# 스트리밍 URL 캐시
+URL_CACHE_MAX_ENTRIES = _env_int("URL_CACHE_MAX_ENTRIES", 5000)
+# URL의 expire= 값보다 이만큼 일찍 만료 처리 (초)
+URL_EXPIRY_MARGIN_SECONDS = _env_int("URL_EXPIRY_MARGIN_SECONDS", 1800)
+# expire= 값을 찾지 못했을 때 사용하는 TTL (초)
+URL_CACHE_DEFAULT_TTL = _env_int("URL_CACHE_DEFAULT_TTL", 5 * 3600)
+URL_CACHE_PURGE_INTERVAL = _env_int("URL_CACHE_PURGE_INTERVAL", 300)
+
+# 영구 캐시 (SQLite) 파일 경로 - 비워두면 메모리 캐시만 사용
+# 여러 워커가 같은 파일을 공유하므로 재시작/배포 후에도 캐시가 유지된다
+CACHE_DB_PATH = os.getenv("CACHE_DB_PATH", "")
+# 다른 워커가 쓰는 중일 때 기다리는 최대 시간 (ms) - 넘기면 영구 캐시 읽기/쓰기를 건너뛴다
+CACHE_DB_BUSY_TIMEOUT_MS = _env_int("CACHE_DB_BUSY_TIMEOUT_MS", 50)
+
+# /api/songs/batch 한 번에 조회할 수 있는 최대 곡 수
+SONG_BATCH_MAX_SIZE = _env_int("SONG_BATCH_MAX_SIZE", 50)
+
+# 목록 응답(검색/차트/플레이리스트) 상위 곡의 스트리밍 URL 미리 받기
+PREFETCH_ENABLED = _env_bool("PREFETCH_ENABLED", False)
+# 목록마다 미리 받을 곡 수
+PREFETCH_TOP_K = _env_int("PREFETCH_TOP_K", 5)
+# 대기열 최대 길이 - 넘치면 우선순위가 낮은 작업부터 취소
+PREFETCH_MAX_PENDING = _env_int("PREFETCH_MAX_PENDING", 50)
+# 동시에 실행할 미리 받기 작업 수
+PREFETCH_CONCURRENCY = _env_int("PREFETCH_CONCURRENCY", 2)
+
+# 공용 응답 캐시 TTL (초) - TTL이 지나면 캐시된 값을 반환하면서 백그라운드에서 갱신
+HOME_CACHE_TTL = _env_int("HOME_CACHE_TTL", 600)
+MOODS_CACHE_TTL = _env_int("MOODS_CACHE_TTL", 6 * 3600)
+MOOD_PLAYLISTS_CACHE_TTL = _env_int("MOOD_PLAYLISTS_CACHE_TTL", 3600)
+# TTL이 지난 뒤에도 바로 반환할 수 있는 최대 시간 (초)
+RESPONSE_CACHE_MAX_STALE = _env_int("RESPONSE_CACHE_MAX_STALE", 24 * 3600)
+RESPONSE_CACHE_MAX_ENTRIES = _env_int("RESPONSE_CACHE_MAX_ENTRIES", 512)
+
+# /api/debug/profile 샘플링 프로파일러 사용 여부
+PROFILER_ENABLED = _env_bool("PROFILER_ENABLED", False)
+
+# 플레이리스트 페이지네이션/스트리밍
+# 전체 트랙 목록(스냅샷)을 한 번 받아 두고 커서로 잘라서 제공
+PLAYLIST_SNAPSHOT_TTL = _env_int("PLAYLIST_SNAPSHOT_TTL", 600)
+PLAYLIST_SNAPSHOT_MAX_ENTRIES = _env_int("PLAYLIST_SNAPSHOT_MAX_ENTRIES", 64)
+# 스냅샷으로 받을 최대 트랙 수
+PLAYLIST_MAX_TRACKS = _env_int("PLAYLIST_MAX_TRACKS", 5000)
+
+# 검색 결과 캐시 ((정규화된 검색어, limit) 단위)
+SEARCH_CACHE_TTL = _env_int("SEARCH_CACHE_TTL", 600)
+SEARCH_CACHE_MAX_ENTRIES = _env_int("SEARCH_CACHE_MAX_ENTRIES", 2000)
+# 검색어 추천 접두사 색인
+SUGGESTION_CACHE_TTL = _env_int("SUGGESTION_CACHE_TTL", 3600)
+SUGGESTION_INDEX_MAX_TERMS = _env_int("SUGGESTION_INDEX_MAX_TERMS", 20000)
+# 색인에서 이만큼 이상 찾으면 업스트림 없이 응답
+SUGGESTION_MIN_LOCAL_RESULTS = _env_int("SUGGESTION_MIN_LOCAL_RESULTS", 5)
+
+# 업스트림 호출 제어 (governor.py)
+# 호출 종류(메서드)별 초당 허용 호출 수와 버스트
+YTMUSIC_RATE = float(os.getenv("YTMUSIC_RATE", 20))
+YTMUSIC_BURST = _env_int("YTMUSIC_BURST", 40)
+# yt-dlp 추출은 /api/songs/batch와 대기열 미리 받기가 한꺼번에 요청하므로 버스트를 넉넉히 두되,
+# 지속 속도를 너무 높이면 YouTube 봇 확인(429)을 받기 쉬워진다 - 그때는 한도가 자동으로 줄어든다
+YTDLP_RATE = float(os.getenv("YTDLP_RATE", 10))
+YTDLP_BURST = _env_int("YTDLP_BURST", 30)
+# 서킷 브레이커: 최근 BREAKER_WINDOW초 동안 BREAKER_MIN_CALLS회 이상 호출 중
+# 업스트림 오류(제한 응답, 연결/전송 오류, 시간 초과) 비율이 BREAKER_THRESHOLD 이상이면
+# BREAKER_COOLDOWN초 동안 호출 차단. 비공개/삭제/지역 제한 같은 곡별 오류는 세지 않는다
+BREAKER_THRESHOLD = float(os.getenv("BREAKER_THRESHOLD", 0.5))
+BREAKER_MIN_CALLS = _env_int("BREAKER_MIN_CALLS", 20)
+BREAKER_WINDOW = _env_int("BREAKER_WINDOW", 30)
+BREAKER_COOLDOWN = _env_int("BREAKER_COOLDOWN", 30)
+
+# HTTP 조건부 요청 / 응답 압축
+# 목록 응답을 클라이언트가 다시 확인 없이 쓸 수 있는 시간 (초) - 지나면 If-None-Match로 재검증
+CLIENT_CACHE_MAX_AGE = _env_int("CLIENT_CACHE_MAX_AGE", 60)
+# 이 크기(바이트) 이상인 응답만 압축
+COMPRESSION_MIN_SIZE = _env_int("COMPRESSION_MIN_SIZE", 1024)
+COMPRESSION_GZIP_LEVEL = _env_int("COMPRESSION_GZIP_LEVEL", 6)
+COMPRESSION_BROTLI_QUALITY = _env_int("COMPRESSION_BROTLI_QUALITY", 5)
+
+# 차트 스냅샷: 미리 받아 둘 국가 (쉼표로 구분, 첫 번째가 차트 라우트 기본값)와 갱신 주기 (초)
+CHART_COUNTRIES = [c.strip().upper() for c in os.getenv("CHART_COUNTRIES", "KR").split(",") if c.strip()] or ["KR"]
+# 이전 설정 이름(CHARTS_CACHE_TTL)도 기본값으로 인정
+CHART_REFRESH_INTERVAL = _env_int("CHART_REFRESH_INTERVAL", _env_int("CHARTS_CACHE_TTL", 1800))
+
+# 목록 응답에서 모은 곡 메타데이터 최대 개수 (/api/songs가 get_song 대신 사용)
+TRACK_INDEX_MAX_ENTRIES = _env_int("TRACK_INDEX_MAX_ENTRIES", 50000)
+
+# 오디오 프록시 (/api/stream/{video_id})
+STREAM_PROXY_ENABLED = _env_bool("STREAM_PROXY_ENABLED", False)
+# 업스트림에서 한 번에 읽어 전달하는 크기 (바이트) - 연결당 메모리 사용량
+STREAM_PROXY_CHUNK_SIZE = _env_int("STREAM_PROXY_CHUNK_SIZE", 64 * 1024)
+# 업스트림(googlevideo) keep-alive 연결 풀 크기
+STREAM_PROXY_MAX_CONNECTIONS = _env_int("STREAM_PROXY_MAX_CONNECTIONS", 100)
+STREAM_PROXY_TIMEOUT = _env_int("STREAM_PROXY_TIMEOUT", 30)
+
+# 가사 캐시 (browse_id 단위)
+LYRICS_CACHE_TTL = _env_int("LYRICS_CACHE_TTL", 24 * 3600)
+LYRICS_CACHE_MAX_ENTRIES = _env_int("LYRICS_CACHE_MAX_ENTRIES", 2000)
+
+# /api/moods/catalog - 카테고리별 플레이리스트 동시 조회 수, 전체 문서 캐시 시간 (초)
+MOOD_CATALOG_CONCURRENCY = _env_int("MOOD_CATALOG_CONCURRENCY", 8)
+MOOD_CATALOG_CACHE_TTL = _env_int("MOOD_CATALOG_CACHE_TTL", MOOD_PLAYLISTS_CACHE_TTL)
+
+# 대기열 URL 임대 (/ws/queue)
+# 재생 중인 곡부터 URL을 미리 보내 둘 곡 수
+LEASE_LOOKAHEAD = _env_int("LEASE_LOOKAHEAD", 3)
+# URL 재조회 시점을 캐시 만료 후 0 ~ 이 시간(초) 사이로 분산 (URL_EXPIRY_MARGIN_SECONDS보다 작아야 함)
+LEASE_REFRESH_JITTER = _env_int("LEASE_REFRESH_JITTER", 300)
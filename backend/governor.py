@@ -0,0 +1,334 @@
+# 업스트림(ytmusicapi, yt-dlp) 호출 제어
+# - 호출 종류별 토큰 버킷 속도 제한
+# - 지연 시간/오류율에 따라 조절되는 동시 실행 한도 (AIMD)
+# - 오류가 몰리면 호출을 잠시 막는 서킷 브레이커 (그동안 라우트는 캐시/이전 값으로 응답)
+# - 우선순위: 사용자 요청(INTERACTIVE)이 미리 받기/백그라운드 갱신(BACKGROUND)보다 먼저 실행
+import asyncio
+import contextvars
+import heapq
+import itertools
+import time
+from collections import deque
+from contextlib import asynccontextmanager, contextmanager
+
+INTERACTIVE = 0
+BACKGROUND = 1
+
+_priority = contextvars.ContextVar("upstream_priority", default=INTERACTIVE)
+
+# YouTube가 요청을 제한할 때 보이는 오류 메시지
+_THROTTLE_MARKERS = ("429", "Too Many Requests", "rate limit", "confirm you're not a bot", "confirm you’re not a bot")
+# 연결/전송 오류와 서버 오류 (yt-dlp 오류는 워커에서 메시지로 전달되므로 메시지로 구분)
+_TRANSPORT_MARKERS = (
+    "TransportError", "timed out", "Timeout", "Connection", "Failed to resolve", "HTTP Error 5", "HTTP 5"
+)
+
+
+class UpstreamUnavailable(Exception):
+    """서킷 브레이커가 열려 있어 업스트림을 호출하지 않음"""
+
+
+@contextmanager
+def background_priority():
+    """이 블록(과 여기서 만든 태스크)의 업스트림 호출을 BACKGROUND 우선순위로 실행"""
+    token = _priority.set(BACKGROUND)
+    try:
+        yield
+    finally:
+        _priority.reset(token)
+
+
+class SharedPriority:
+    """여러 호출자가 함께 기다리는 작업(SingleFlight, 백그라운드 갱신)의 우선순위.
+
+    작업은 처음 시작한 호출자의 우선순위로 실행되지만, 사용자 요청이 합류하면 INTERACTIVE로
+    올라가고 한도 대기열 순서와 그 안에서 시작한 다른 공유 작업에도 반영된다. 내려가지는 않는다.
+    """
+
+    __slots__ = ("value", "_listeners")
+
+    def __init__(self, value):
+        self.value = value
+        self._listeners = []
+
+    def promote(self, value):
+        if value >= self.value:
+            return
+        self.value = value
+        for listener in list(self._listeners):
+            listener()
+
+    def subscribe(self, listener):
+        self._listeners.append(listener)
+
+    def unsubscribe(self, listener):
+        try:
+            self._listeners.remove(listener)
+        except ValueError:
+            pass
+
+
+def current_priority():
+    priority = _priority.get()
+    return priority.value if isinstance(priority, SharedPriority) else priority
+
+
+def _follow_outer(shared):
+    # 바깥 공유 작업 안에서 시작/합류했으면 바깥 작업이 올라갈 때 같이 올라간다
+    outer = _priority.get()
+    if isinstance(outer, SharedPriority) and outer is not shared:
+        outer.subscribe(lambda: shared.promote(outer.value))
+
+
+def start_shared():
+    """새 공유 작업의 우선순위 - 지금 호출자의 우선순위로 시작"""
+    shared = SharedPriority(current_priority())
+    _follow_outer(shared)
+    return shared
+
+
+def join_shared(shared):
+    """진행 중인 공유 작업에 합류 - 합류한 호출자의 우선순위가 더 높으면 작업을 올린다"""
+    shared.promote(current_priority())
+    _follow_outer(shared)
+
+
+async def run_shared(shared, awaitable):
+    """공유 작업 태스크 안에서 실행 - 이 태스크의 업스트림 호출은 shared의 현재 우선순위를 따른다"""
+    _priority.set(shared)
+    return await awaitable
+
+
+def is_throttled(error):
+    message = str(error)
+    return any(marker in message for marker in _THROTTLE_MARKERS)
+
+
+def is_upstream_failure(error):
+    """업스트림 자체의 장애(제한 응답, 연결/전송 오류, 시간 초과)인지.
+
+    비공개/삭제/지역 제한 영상처럼 곡 하나에만 해당하는 오류는 업스트림이 정상 응답한 것이므로 제외한다.
+    """
+    if isinstance(error, (TimeoutError, asyncio.TimeoutError, ConnectionError)):
+        return True
+    message = str(error)
+    return is_throttled(error) or any(marker in message for marker in _TRANSPORT_MARKERS)
+
+
+class TokenBucket:
+    def __init__(self, rate, burst):
+        self.rate = rate
+        self.burst = burst
+        self._tokens = burst
+        self._updated = time.monotonic()
+
+    async def acquire(self):
+        while True:
+            now = time.monotonic()
+            self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            if self._tokens >= 1:
+                self._tokens -= 1
+                return
+            await asyncio.sleep((1 - self._tokens) / self.rate)
+
+
+class AdaptiveLimiter:
+    """동시 실행 한도를 관측한 오류, 제한 응답, 대기열에 맞춰 조절 (AIMD).
+
+    성공하면 한도를 천천히 늘리고, 오류가 나면 줄인다(제한 응답이면 절반으로).
+    지연 시간은 호출 종류별 평균 지연(기준)과 비교해, 기준의 tolerance배보다 느리면서
+    한도를 기다리는 호출이 있을 때만 줄인다 - 대기열 없이 느린 호출은 업스트림 지연의
+    자연스러운 편차로 보고 한도를 그대로 둔다. 대기열은 우선순위 순서로 처리된다.
+    """
+
+    def __init__(self, initial, minimum, maximum, tolerance=2.0, smoothing=0.05):
+        self.limit = float(initial)
+        self.minimum = minimum
+        self.maximum = maximum
+        self.tolerance = tolerance
+        self.smoothing = smoothing
+        self.in_flight = 0
+        self.baselines = {}  # 호출 종류: 평균 지연 시간 (지수 이동 평균)
+        self._waiters = []  # (우선순위, 순번, future)
+        self._seq = itertools.count()
+
+    @property
+    def waiting(self):
+        # 우선순위가 올라간 대기자는 항목이 둘이므로 future 기준으로 센다
+        return len({future for _, _, future in self._waiters if not future.done()})
+
+    async def acquire(self, priority, shared=None):
+        if self.in_flight < int(self.limit) and not self.waiting:
+            self.in_flight += 1
+            return
+        future = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._waiters, (priority, next(self._seq), future))
+
+        def promote():
+            # 기다리는 중에 공유 작업의 우선순위가 올라가면 높은 우선순위로 다시 줄을 선다
+            if not future.done():
+                heapq.heappush(self._waiters, (shared.value, next(self._seq), future))
+
+        if shared is not None:
+            shared.subscribe(promote)
+        try:
+            await future
+        except asyncio.CancelledError:
+            if future.done() and not future.cancelled():
+                # 자리를 받은 직후 취소된 경우 다음 대기자에게 넘긴다
+                self.release()
+            raise
+        finally:
+            if shared is not None:
+                shared.unsubscribe(promote)
+
+    def release(self):
+        self.in_flight -= 1
+        self._wake()
+
+    def _wake(self):
+        while self._waiters and self.in_flight < int(self.limit):
+            _, _, future = heapq.heappop(self._waiters)
+            if not future.done():
+                self.in_flight += 1
+                future.set_result(None)
+
+    def on_success(self, call, latency):
+        baseline = self.baselines.get(call, latency)
+        # 기준값은 천천히 따라가게 해서 업스트림 변화에 적응
+        self.baselines[call] = baseline + (latency - baseline) * self.smoothing
+        if latency > baseline * self.tolerance and self.waiting:
+            self.limit = max(self.minimum, self.limit * 0.9)
+        else:
+            self.limit = min(self.maximum, self.limit + 1 / self.limit)
+        self._wake()
+
+    def on_error(self, throttled):
+        self.limit = max(self.minimum, self.limit * (0.5 if throttled else 0.9))
+
+
+class CircuitBreaker:
+    """최근 window초 동안 오류율이 threshold 이상이면 cooldown초 동안 호출을 막는다.
+
+    cooldown 이후에는 한 번의 시험 호출(half-open)로 복구 여부를 확인한다.
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, threshold, min_calls, window, cooldown):
+        self.threshold = threshold
+        self.min_calls = min_calls
+        self.window = window
+        self.cooldown = cooldown
+        self.state = self.CLOSED
+        self.opened = 0
+        self._opened_at = 0.0
+        self._probe_in_flight = False
+        self._results = deque()  # (시각, 성공 여부)
+
+    def allow(self, priority):
+        if self.state == self.CLOSED:
+            return True
+        if self.state == self.OPEN and time.monotonic() - self._opened_at >= self.cooldown:
+            self.state = self.HALF_OPEN
+        # 시험 호출은 사용자 요청만, 한 번에 하나씩
+        if self.state == self.HALF_OPEN and priority == INTERACTIVE and not self._probe_in_flight:
+            self._probe_in_flight = True
+            return True
+        return False
+
+    def record(self, success):
+        now = time.monotonic()
+        if self.state == self.HALF_OPEN:
+            self._probe_in_flight = False
+            if success:
+                self.state = self.CLOSED
+                self._results.clear()
+            else:
+                self._open(now)
+            return
+        self._results.append((now, success))
+        while self._results and now - self._results[0][0] > self.window:
+            self._results.popleft()
+        if len(self._results) >= self.min_calls:
+            failures = sum(1 for _, ok in self._results if not ok)
+            if failures / len(self._results) >= self.threshold:
+                self._open(now)
+
+    def abandon(self):
+        """결과 없이 취소된 호출 - 시험 호출이었다면 다음 요청이 다시 시험할 수 있게 한다"""
+        self._probe_in_flight = False
+
+    def _open(self, now):
+        self.state = self.OPEN
+        self.opened += 1
+        self._opened_at = now
+        self._results.clear()
+
+
+class Governor:
+    """업스트림 하나(ytmusicapi 또는 yt-dlp)에 대한 호출 제어"""
+
+    def __init__(self, name, rate, burst, max_concurrency, breaker):
+        self.name = name
+        self.rate = rate
+        self.burst = burst
+        self.limiter = AdaptiveLimiter(initial=max_concurrency, minimum=1, maximum=max_concurrency)
+        self.breaker = breaker
+        self._buckets = {}
+        self.rejected = 0
+
+    def _bucket(self, call):
+        bucket = self._buckets.get(call)
+        if bucket is None:
+            bucket = self._buckets[call] = TokenBucket(self.rate, self.burst)
+        return bucket
+
+    @asynccontextmanager
+    async def guard(self, call):
+        shared = _priority.get()
+        priority = current_priority()
+        if not self.breaker.allow(priority):
+            self.rejected += 1
+            raise UpstreamUnavailable(f"{self.name} 업스트림 호출이 일시적으로 차단되었습니다 ({call})")
+        # 시험 호출이 한도 대기 중에 취소되어도 abandon()이 불리도록 대기도 try 안에서 한다
+        probe = self.breaker.state == CircuitBreaker.HALF_OPEN
+        acquired = False
+        start = time.monotonic()
+        try:
+            await self.limiter.acquire(priority, shared if isinstance(shared, SharedPriority) else None)
+            acquired = True
+            await self._bucket(call).acquire()
+            start = time.monotonic()
+            yield
+        except asyncio.CancelledError:
+            if probe:
+                self.breaker.abandon()
+            raise
+        except Exception as e:
+            if is_upstream_failure(e):
+                self.limiter.on_error(is_throttled(e))
+                self.breaker.record(False)
+            else:
+                # 곡별 오류 - 업스트림은 정상 응답했으므로 한도는 그대로 두고 성공으로 기록
+                self.breaker.record(True)
+            raise
+        else:
+            self.limiter.on_success(call, time.monotonic() - start)
+            self.breaker.record(True)
+        finally:
+            if acquired:
+                self.limiter.release()
+
+    def stats(self):
+        return {
+            "limit": round(self.limiter.limit, 2),
+            "inFlight": self.limiter.in_flight,
+            "waiting": self.limiter.waiting,
+            "breaker": self.breaker.state,
+            "breakerOpened": self.breaker.opened,
+            "rejected": self.rejected,
+        }
@@ -0,0 +1,174 @@
+# 조건부 요청(ETag / If-None-Match)과 응답 압축을 처리하는 ASGI 미들웨어
+import gzip
+import hashlib
+from collections import OrderedDict
+
+from starlette.datastructures import Headers, MutableHeaders
+
+import metrics
+
+try:
+    import brotli
+except ImportError:  # brotli가 없으면 gzip만 사용
+    brotli = None
+
+COMPRESSIBLE_TYPES = ("application/json", "text/")
+
+not_modified = metrics.Counter(
+    "ytmusic_http_not_modified_total", "If-None-Match가 일치해 본문 없이 304로 응답한 수", ("route",)
+)
+compressed_bytes = metrics.Counter(
+    "ytmusic_http_compressed_bytes_total", "압축 전/후 응답 본문 크기 합계", ("encoding", "stage")
+)
+
+
+def make_etag(body):
+    """본문 내용으로 만든 약한 ETag (압축 여부와 관계없이 같은 값)"""
+    return 'W/"' + hashlib.blake2b(body, digest_size=16).hexdigest() + '"'
+
+
+def etag_matches(if_none_match, etag):
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    # If-None-Match는 약한 비교를 사용한다
+    target = etag.removeprefix("W/")
+    return any(tag.strip().removeprefix("W/") == target for tag in if_none_match.split(","))
+
+
+def accepted_encodings(accept_encoding):
+    """Accept-Encoding 헤더에서 q=0이 아닌 인코딩 이름 집합"""
+    accepted = set()
+    for part in accept_encoding.lower().split(","):
+        name, _, params = part.strip().partition(";")
+        if not name:
+            continue
+        q = params.strip()
+        if q.startswith("q="):
+            try:
+                if float(q[2:]) <= 0:
+                    continue
+            except ValueError:
+                continue
+        accepted.add(name.strip())
+    return accepted
+
+
+class HTTPCacheMiddleware:
+    """한 번에 끝나는 GET 응답(JSON/텍스트, 200)에 ETag와 Cache-Control을 붙이고,
+    If-None-Match가 일치하면 304로, 크기가 min_size 이상이면 br/gzip으로 압축해 보낸다.
+
+    스트리밍 응답(NDJSON 등)은 버퍼링하지 않고 그대로 통과시킨다.
+    라우트가 Cache-Control: no-store를 붙인 응답(오류 대신 보내는 대체 응답)에는
+    ETag와 라우트별 Cache-Control을 붙이지 않고 304로도 응답하지 않는다.
+    같은 본문을 반복해서 압축하지 않도록 최근 압축 결과를 (ETag, 인코딩) 단위로 보관한다.
+    """
+
+    def __init__(self, app, cache_control=None, min_size=1024, gzip_level=6, brotli_quality=5,
+                 max_cached_bodies=128):
+        self.app = app
+        self.cache_control = cache_control or {}
+        self.min_size = min_size
+        self.gzip_level = gzip_level
+        self.brotli_quality = brotli_quality
+        self.max_cached_bodies = max_cached_bodies
+        self._compressed = OrderedDict()  # (etag, encoding): 압축된 본문
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["method"] != "GET":
+            await self.app(scope, receive, send)
+            return
+
+        request_headers = Headers(scope=scope)
+        start_message = None
+        passthrough = False
+
+        async def buffered_send(message):
+            nonlocal start_message, passthrough
+            if passthrough:
+                await send(message)
+                return
+            if message["type"] == "http.response.start":
+                start_message = message
+                return
+            if message["type"] != "http.response.body":
+                await send(message)
+                return
+            if message.get("more_body", False) or not self._applies(start_message):
+                passthrough = True
+                await send(start_message)
+                await send(message)
+                return
+            await self._send_complete(scope, request_headers, start_message, message.get("body", b""), send)
+
+        await self.app(scope, receive, buffered_send)
+
+    def _applies(self, start_message):
+        if start_message["status"] != 200:
+            return False
+        headers = Headers(raw=start_message["headers"])
+        if "content-encoding" in headers:
+            return False
+        return headers.get("content-type", "").startswith(COMPRESSIBLE_TYPES)
+
+    def _route_path(self, scope):
+        route = scope.get("route")
+        return getattr(route, "path", None)
+
+    async def _send_complete(self, scope, request_headers, start_message, body, send):
+        headers = MutableHeaders(raw=list(start_message["headers"]))
+        # 압축 결과 보관에도 쓰므로 no-store 응답도 ETag 값은 계산한다
+        etag = make_etag(body)
+        store = "no-store" not in headers.get("cache-control", "")
+        route_path = self._route_path(scope)
+        if store:
+            headers["etag"] = etag
+            cache_control = self.cache_control.get(route_path)
+            if cache_control and "cache-control" not in headers:
+                headers["cache-control"] = cache_control
+        headers.add_vary_header("Accept-Encoding")
+
+        if store and etag_matches(request_headers.get("if-none-match"), etag):
+            not_modified.inc(route_path or "unmatched")
+            del headers["content-length"]
+            del headers["content-type"]
+            await send({"type": "http.response.start", "status": 304, "headers": headers.raw})
+            await send({"type": "http.response.body", "body": b""})
+            return
+
+        if len(body) >= self.min_size:
+            encoding = self._choose_encoding(request_headers.get("accept-encoding", ""))
+            if encoding is not None:
+                compressed_bytes.inc(encoding, "before", amount=len(body))
+                body = self._compress(etag, encoding, body)
+                compressed_bytes.inc(encoding, "after", amount=len(body))
+                headers["content-encoding"] = encoding
+                headers["content-length"] = str(len(body))
+
+        await send({**start_message, "headers": headers.raw})
+        await send({"type": "http.response.body", "body": body})
+
+    def _choose_encoding(self, accept_encoding):
+        accepted = accepted_encodings(accept_encoding)
+        if brotli is not None and "br" in accepted:
+            return "br"
+        if "gzip" in accepted:
+            return "gzip"
+        return None
+
+    def _compress(self, etag, encoding, body):
+        key = (etag, encoding)
+        compressed = self._compressed.get(key)
+        if compressed is not None:
+            self._compressed.move_to_end(key)
+            return compressed
+        if encoding == "br":
+            compressed = brotli.compress(body, quality=self.brotli_quality)
+        else:
+            compressed = gzip.compress(body, compresslevel=self.gzip_level, mtime=0)
+        self._compressed[key] = compressed
+        while len(self._compressed) > self.max_cached_bodies:
+            self._compressed.popitem(last=False)
+        return compressed
+
@@ -0,0 +1,154 @@
+# 재생 대기열 스트리밍 URL 임대 (/ws/queue)
+# 클라이언트가 보낸 대기열의 앞쪽 곡들에 대해 URL을 미리 보내고, 만료 전에 새 URL로 교체해 보낸다
+import asyncio
+import logging
+import random
+import time
+
+from governor import background_priority
+
+logger = logging.getLogger(__name__)
+
+
+class LeaseSession:
+    """웹소켓 연결 하나의 임대 목록. 대기열 앞쪽 lookahead곡마다 임대 태스크를 하나씩 유지한다"""
+
+    def __init__(self, manager, send):
+        self.manager = manager
+        self._send = send
+        self._send_lock = asyncio.Lock()
+        self._leases = {}  # video_id: 임대 태스크
+
+    async def send(self, message):
+        async with self._send_lock:
+            await self._send(message)
+
+    def update(self, video_ids):
+        """새 대기열 반영 - 앞쪽 lookahead곡만 임대하고, 빠진 곡의 임대는 취소"""
+        wanted = []
+        for video_id in video_ids:
+            if isinstance(video_id, str) and video_id and video_id not in wanted:
+                wanted.append(video_id)
+            if len(wanted) >= self.manager.lookahead:
+                break
+
+        for video_id in list(self._leases):
+            if video_id not in wanted:
+                self._leases.pop(video_id).cancel()
+        for position, video_id in enumerate(wanted):
+            if video_id not in self._leases:
+                # 지금 재생할 곡(맨 앞)만 사용자 요청 우선순위, 나머지는 백그라운드
+                task = asyncio.ensure_future(self.manager.hold(self, video_id, background=position > 0))
+                task.add_done_callback(lambda done, video_id=video_id: self._forget(video_id, done))
+                self._leases[video_id] = task
+        return wanted
+
+    def _forget(self, video_id, task):
+        """끝난 임대(URL이 없는 곡 등)를 목록에서 빼서 다음 update()에서 다시 시도하게 한다"""
+        if self._leases.get(video_id) is task:
+            del self._leases[video_id]
+
+    def close(self):
+        for task in self._leases.values():
+            task.cancel()
+        self._leases.clear()
+        self.manager.sessions.discard(self)
+
+    def __len__(self):
+        return len(self._leases)
+
+
+class LeaseManager:
+    """스트리밍 URL 임대.
+
+    resolve(video_id)는 /api/songs와 같은 경로(url_cache, 추출)로 곡 정보를 돌려주고,
+    cache_expires_at(video_id)는 url_cache에서 그 URL이 만료 처리되는 시각을 돌려준다.
+    임대한 URL은 캐시 만료 시각에 0 ~ jitter초를 더한 시점에 다시 받아 보낸다.
+    캐시 만료는 실제 URL 만료보다 여유 시간만큼 이르므로, 클라이언트는 항상 유효한 URL을 갖고 있고
+    같은 시각에 받은 URL들의 재추출이 한꺼번에 몰리지 않는다.
+    """
+
+    def __init__(self, resolve, cache_expires_at, url_expiry, lookahead=3, jitter=300, retry_delay=30,
+                 default_ttl=3600):
+        self.resolve = resolve
+        self.cache_expires_at = cache_expires_at
+        self.url_expiry = url_expiry
+        self.lookahead = lookahead
+        self.jitter = jitter
+        self.retry_delay = retry_delay
+        self.default_ttl = default_ttl
+        self.sessions = set()
+        self.pushed = 0
+        self.refreshed = 0
+        self.failed = 0
+
+    def open(self, send):
+        session = LeaseSession(self, send)
+        self.sessions.add(session)
+        return session
+
+    async def _resolve(self, video_id, background):
+        if background:
+            with background_priority():
+                return await self.resolve(video_id)
+        return await self.resolve(video_id)
+
+    def _refresh_at(self, video_id, expires_at):
+        refresh_at = self.cache_expires_at(video_id)
+        if refresh_at is None:
+            refresh_at = expires_at - self.jitter * 2
+        return refresh_at + random.uniform(0, self.jitter)
+
+    async def hold(self, session, video_id, background):
+        try:
+            await self._hold(session, video_id, background)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            # 연결이 끊겨 전송에 실패한 경우 - 세션 정리는 웹소켓 라우트에서 한다
+            logger.debug("임대 중단 (%s): %r", video_id, e)
+
+    async def _hold(self, session, video_id, background):
+        renewals = 0
+        while True:
+            try:
+                song = await self._resolve(video_id, background)
+            except Exception as e:
+                self.failed += 1
+                logger.warning("임대 URL 조회 실패 (%s): %r", video_id, e)
+                await session.send({"type": "unavailable", "videoId": video_id, "error": str(e)})
+                await asyncio.sleep(self.retry_delay)
+                continue
+
+            url = song.get("streamUrl")
+            if not url:
+                await session.send({"type": "unavailable", "videoId": video_id, "error": None})
+                return
+
+            expires_at = self.url_expiry(url) or time.time() + self.default_ttl
+            refresh_at = self._refresh_at(video_id, expires_at)
+            await session.send({
+                "type": "lease",
+                "videoId": video_id,
+                "streamUrl": url,
+                "expiresAt": expires_at,
+                "refreshAt": round(refresh_at, 3),
+                "song": song
+            })
+            self.pushed += 1
+            if renewals:
+                self.refreshed += 1
+            renewals += 1
+            # 대기열 앞쪽 곡이 바뀌면 이 태스크는 취소된다 (LeaseSession.update)
+            await asyncio.sleep(max(refresh_at - time.time(), self.retry_delay))
+            # 이후 재조회는 클라이언트 재생과 무관하므로 항상 백그라운드 우선순위
+            background = True
+
+    def stats(self):
+        return {
+            "sessions": len(self.sessions),
+            "leases": sum(len(session) for session in self.sessions),
+            "pushed": self.pushed,
+            "refreshed": self.refreshed,
+            "failed": self.failed,
+        }
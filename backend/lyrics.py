@@ -0,0 +1,118 @@
+import bisect
+from array import array
+from dataclasses import dataclass, field
+
+
+@dataclass(slots=True)
+class Lyrics:
+    """정규화한 가사. 싱크 가사는 줄 텍스트와 시작/종료 시각(ms) 배열을 나란히 보관한다"""
+    source: str | None
+    text: str | None = None  # 싱크 정보가 없는 가사 전체
+    lines: list = field(default_factory=list)  # 싱크 가사 줄 텍스트
+    ids: list = field(default_factory=list)
+    starts: array = field(default_factory=lambda: array("q"))
+    ends: array = field(default_factory=lambda: array("q"))
+    _response: dict | None = field(default=None, repr=False)
+
+    @property
+    def found(self):
+        return self.text is not None or bool(self.lines)
+
+    @property
+    def has_timestamps(self):
+        return bool(self.lines)
+
+    def _line(self, index):
+        return {
+            "index": index,
+            "text": self.lines[index],
+            "startTime": self.starts[index],
+            "endTime": self.ends[index],
+            "id": self.ids[index],
+        }
+
+    def to_response(self):
+        """/api/lyrics 전체 응답 (처음 한 번 만들어 재사용)"""
+        if self._response is None:
+            if self.has_timestamps:
+                lyrics = [
+                    {"text": text, "startTime": start, "endTime": end, "id": line_id}
+                    for text, start, end, line_id in zip(self.lines, self.starts, self.ends, self.ids)
+                ]
+            else:
+                lyrics = self.text
+            self._response = {
+                "lyrics": lyrics,
+                "hasTimestamps": self.has_timestamps,
+                "source": self.source,
+                "error": None
+            }
+        return self._response
+
+    def window(self, at, before=1, after=2):
+        """at(ms) 시점에 불리는 줄과 앞뒤 줄.
+
+        index는 현재 불리는 줄(줄 사이 간주 구간이면 None), nextChangeAt은 다음에 줄이 바뀌는 시각.
+        """
+        position = bisect.bisect_right(self.starts, at) - 1
+        active = position >= 0 and at < self.ends[position]
+        if active:
+            next_change = self.ends[position]
+            if position + 1 < len(self.starts):
+                next_change = min(next_change, self.starts[position + 1])
+        else:
+            next_change = self.starts[position + 1] if position + 1 < len(self.starts) else None
+
+        center = max(position, 0)
+        first = max(center - before, 0)
+        last = min(center + after + 1, len(self.lines))
+        return {
+            "at": at,
+            "index": position if active else None,
+            "lines": [self._line(index) for index in range(first, last)],
+            "nextChangeAt": next_change,
+            "hasTimestamps": True,
+            "source": self.source,
+            "error": None
+        }
+
+    def to_lrc(self):
+        """LRC 형식 ([mm:ss.xx]가사). 싱크 정보가 없으면 가사 텍스트 그대로"""
+        if not self.has_timestamps:
+            return self.text or ""
+        rows = []
+        for text, start in zip(self.lines, self.starts):
+            minutes, milliseconds = divmod(start, 60000)
+            rows.append(f"[{minutes:02d}:{milliseconds // 1000:02d}.{milliseconds % 1000 // 10:02d}]{text}")
+        return "\n".join(rows) + "\n"
+
+
+def parse_lyrics(lyrics_data):
+    """ytmusicapi get_lyrics 결과(LyricLine 목록 또는 문자열)를 Lyrics로 변환"""
+    if not lyrics_data:
+        return Lyrics(source=None)
+    source = lyrics_data.get("source")
+    raw_lines = lyrics_data.get("lyrics")
+    if isinstance(raw_lines, str):
+        return Lyrics(source=source, text=raw_lines)
+    if not isinstance(raw_lines, list) or not raw_lines:
+        return Lyrics(source=source)
+
+    rows = []
+    for line in raw_lines:
+        start = getattr(line, "start_time", None)
+        if start is None:
+            # 싱크 정보가 없는 줄이 섞여 있으면 전체를 일반 가사로 취급
+            return Lyrics(source=source, text="\n".join(getattr(item, "text", str(item)) for item in raw_lines))
+        end = getattr(line, "end_time", None)
+        rows.append((start, end if end is not None else start, getattr(line, "text", ""), getattr(line, "id", None)))
+    # 이진 탐색을 위해 시작 시각 순으로 정렬
+    rows.sort(key=lambda row: row[0])
+
+    return Lyrics(
+        source=source,
+        lines=[row[2] for row in rows],
+        ids=[row[3] for row in rows],
+        starts=array("q", (row[0] for row in rows)),
+        ends=array("q", (row[1] for row in rows))
+    )
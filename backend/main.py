@@ -1,20 +1,119 @@
-from fastapi import FastAPI, HTTPException, Query
+import asyncio
+import base64
+import dataclasses
+import logging
+import time
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, HTTPException, Query, Request, WebSocket, WebSocketDisconnect
 from fastapi.middleware.cors import CORSMiddleware
-from ytmusicapi import YTMusic
-import yt_dlp
-import os
-import traceback
-from dotenv import load_dotenv
-from datetime import datetime, timedelta
+from fastapi.responses import PlainTextResponse, StreamingResponse
+from pydantic import BaseModel, Field
+from typing import List, Optional
+
+import config
+import metrics
+import upstream
+from cache import PersistentStore, ResponseCache, SingleFlight, TTLCache
+from charts import ChartScheduler, build_chart
+from governor import INTERACTIVE, UpstreamUnavailable, current_priority, is_upstream_failure
+from http_cache import HTTPCacheMiddleware
+from leases import LeaseManager
+from lyrics import parse_lyrics
+from models import FastJSONResponse, dumps, playlist_from_item, thumbnail_url, track_from_item
+from prefetch import Prefetcher
+from profiler import SamplingProfiler, render_collapsed
+from stream_proxy import StreamProxy
+from suggest import SuggestionIndex, normalize_query
+from track_index import TrackIndex
+from upstream import call_ytmusic, stream_url_expiry
+from ytdlp_worker import ExtractionError
+
+logger = logging.getLogger("ytmusic")
+
+
+def upstream_error(error, message):
+    # 서킷 브레이커로 차단된 경우는 503, 그 외는 500
+    status_code = 503 if isinstance(error, UpstreamUnavailable) else 500
+    return HTTPException(status_code=status_code, detail=f"{message}: {str(error)}")
+
+
+def fallback_response(content):
+    # 오류 대신 보내는 대체 응답 - 클라이언트/프록시가 저장하지 않도록 no-store (ETag도 붙지 않음)
+    return FastJSONResponse(content, headers={"Cache-Control": "no-store"})
+
+
+# 준비 상태 (/health/ready)
+readiness = {"ready": False, "warmup": "pending", "startedAt": time.time(), "readyAfterSeconds": None}
+
+
+async def warm_up():
+    started = time.perf_counter()
+    try:
+        if config.WARMUP_ENABLED:
+            await upstream.warm_up()
+        readiness["warmup"] = "done" if config.WARMUP_ENABLED else "skipped"
+    except Exception as e:
+        # 준비 작업이 실패해도 요청은 처리할 수 있으므로 준비 완료로 표시
+        logger.warning("준비 작업 실패: %r", e)
+        readiness["warmup"] = "failed"
+    readiness["readyAfterSeconds"] = round(time.perf_counter() - started, 3)
+    readiness["ready"] = True
+
+
+@asynccontextmanager
+async def lifespan(app):
+    purger = asyncio.create_task(url_cache.run_purger(config.URL_CACHE_PURGE_INTERVAL))
+    warmup = asyncio.create_task(warm_up())
+    await chart_scheduler.start()
+    if prefetcher is not None:
+        prefetcher.start()
+    yield
+    warmup.cancel()
+    await chart_scheduler.stop()
+    if prefetcher is not None:
+        await prefetcher.stop()
+    purger.cancel()
+    await stream_proxy.close()
+    upstream.shutdown()
+    if cache_store is not None:
+        cache_store.close()
 
-load_dotenv()
 
 app = FastAPI(
     title="YouTube Music API",
     description="YouTube Music API using ytmusicapi",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan
+)
+
+# 라우트별 Cache-Control - 목록 응답은 잠시 그대로 쓰고 이후 ETag로 재검증,
+# 스트리밍 URL은 요청한 클라이언트 IP에 묶여 있으므로 공유 캐시에 두지 않음
+LIST_CACHE_CONTROL = f"public, max-age={config.CLIENT_CACHE_MAX_AGE}"
+CACHE_CONTROL = {
+    "/api/search": LIST_CACHE_CONTROL,
+    "/api/search/suggestions": f"public, max-age={config.SUGGESTION_CACHE_TTL}",
+    "/api/charts": LIST_CACHE_CONTROL,
+    "/api/charts/list": LIST_CACHE_CONTROL,
+    "/api/playlists/featured": LIST_CACHE_CONTROL,
+    "/api/playlists/{playlist_id}": LIST_CACHE_CONTROL,
+    "/api/moods": f"public, max-age={config.MOODS_CACHE_TTL}",
+    "/api/moods/playlists": LIST_CACHE_CONTROL,
+    "/api/moods/catalog": LIST_CACHE_CONTROL,
+    "/api/lyrics/{browse_id}": "public, max-age=86400",
+    "/api/lyrics/{browse_id}/lrc": "public, max-age=86400",
+    "/api/songs/{video_id}": "private, no-cache",
+}
+
+app.add_middleware(
+    HTTPCacheMiddleware,
+    cache_control=CACHE_CONTROL,
+    min_size=config.COMPRESSION_MIN_SIZE,
+    gzip_level=config.COMPRESSION_GZIP_LEVEL,
+    brotli_quality=config.COMPRESSION_BROTLI_QUALITY
 )
 
+app.add_middleware(metrics.RequestMetricsMiddleware)
+
 app.add_middleware(
     CORSMiddleware,
     allow_origins=["*"],
@@ -23,24 +122,27 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-ytmusic = YTMusic("browser.json", language="ko")
-
-# 전역 yt-dlp 인스턴스 (캐싱 성능 향상)
-ydl_opts = {
-    'format': 'bestaudio/best',
-    'quiet': True,
-    'no_warnings': True,
-    'noplaylist': True,
-    'extract_flat': False,
-    'cachedir': '/tmp/yt-dlp-cache',
-    'age_limit': None,
-    'nocheckcertificate': True,
-}
-ydl = yt_dlp.YoutubeDL(ydl_opts)
+# 스트리밍 URL 캐시 (video_id: {url, title, ...})
+# 만료 시각은 URL의 expire= 값에서 여유 시간을 뺀 값을 사용
+# CACHE_DB_PATH가 설정되면 SQLite 영구 저장소를 2차 캐시로 사용
+cache_store = (
+    PersistentStore(config.CACHE_DB_PATH, busy_timeout=config.CACHE_DB_BUSY_TIMEOUT_MS)
+    if config.CACHE_DB_PATH else None
+)
 
-# 스트리밍 URL 캐시 (video_id: {url, expires_at})
-# YouTube URL은 약 6시간 유효하므로 5시간 캐싱
-url_cache = {}
+url_cache = TTLCache(
+    max_entries=config.URL_CACHE_MAX_ENTRIES,
+    default_ttl=config.URL_CACHE_DEFAULT_TTL,
+    store=cache_store,
+    namespace="songs"
+)
+
+
+def url_cache_expiry(url):
+    expire = stream_url_expiry(url)
+    if expire is None:
+        return time.time() + config.URL_CACHE_DEFAULT_TTL
+    return expire - config.URL_EXPIRY_MARGIN_SECONDS
 
 
 @app.get("/")
@@ -52,45 +154,190 @@ async def root():
     }
 
 
+# 모든 사용자에게 같은 응답을 주는 업스트림 호출 캐시 (무드, 홈)
+response_cache = ResponseCache(
+    max_entries=config.RESPONSE_CACHE_MAX_ENTRIES,
+    max_stale=config.RESPONSE_CACHE_MAX_STALE
+)
+
+async def cached_ytmusic(key, ttl, method, *args, **kwargs):
+    return await response_cache.get(key, ttl, lambda: call_ytmusic(method, *args, **kwargs))
+
+
+# 검색/차트/플레이리스트 응답에 나온 곡의 메타데이터 (/api/songs가 get_song 대신 사용)
+track_index = TrackIndex(max_entries=config.TRACK_INDEX_MAX_ENTRIES)
+
+
+async def build_indexed_chart(country):
+    songs, charts = await build_chart(country)
+    track_index.add_tracks(songs)
+    return songs, charts
+
+
+# 차트 스냅샷 (CHART_COUNTRIES를 CHART_REFRESH_INTERVAL마다 갱신)
+chart_scheduler = ChartScheduler(
+    countries=config.CHART_COUNTRIES,
+    build=build_indexed_chart,
+    interval=config.CHART_REFRESH_INTERVAL,
+    store=cache_store,
+    max_stale=config.RESPONSE_CACHE_MAX_STALE
+)
+
+
+async def get_chart_snapshot(country):
+    try:
+        return await chart_scheduler.get(country.upper())
+    except KeyError:
+        raise HTTPException(status_code=404, detail=f"지원하지 않는 국가입니다: {country}")
+
+
+async def warm_song(video_id):
+    await song_flight.do(video_id, lambda: resolve_song(video_id))
+
+
+# 목록 응답 상위 곡의 스트리밍 URL을 백그라운드에서 미리 받아 둔다 (PREFETCH_ENABLED)
+prefetcher = Prefetcher(
+    warm=warm_song,
+    is_warm=lambda video_id: bool((url_cache.peek(video_id) or {}).get('url')) or song_flight.in_flight(video_id),
+    top_k=config.PREFETCH_TOP_K,
+    max_pending=config.PREFETCH_MAX_PENDING,
+    concurrency=config.PREFETCH_CONCURRENCY
+) if config.PREFETCH_ENABLED else None
+
+
+def schedule_prefetch(songs):
+    if prefetcher is not None:
+        prefetcher.schedule([song.videoId for song in songs])
+
+
+@app.get("/health/live")
+async def liveness():
+    return {"status": "ok"}
+
+
+@app.get("/health/ready")
+async def readiness_check():
+    return FastJSONResponse(readiness, status_code=200 if readiness["ready"] else 503)
+
+
+@app.get("/api/cache/stats")
+async def get_cache_stats():
+    stats = {
+        "urlCache": url_cache.stats(),
+        "responseCache": response_cache.stats(),
+        "searchCache": search_cache.stats(),
+        "lyricsCache": lyrics_cache.stats(),
+        "unavailableSongs": unavailable_songs.stats(),
+        "charts": chart_scheduler.stats(),
+        "tracks": track_index.stats(),
+        "streamProxy": stream_proxy.stats(),
+        "leases": lease_manager.stats(),
+        "suggestions": suggestion_index.stats(),
+        "extraction": upstream.extract_pool.stats(),
+        "governor": {
+            "ytmusic": upstream.ytmusic_governor.stats(),
+            "ytdlp": upstream.ytdlp_governor.stats()
+        }
+    }
+    if prefetcher is not None:
+        stats["prefetch"] = prefetcher.stats()
+    return stats
+
+
+def _cache_gauges():
+    yield ("url",), len(url_cache)
+    yield ("response",), response_cache.stats()["size"]
+    yield ("search",), search_cache.stats()["size"]
+    yield ("lyrics",), lyrics_cache.stats()["size"]
+    yield ("suggestions",), suggestion_index.stats()["size"]
+    yield ("tracks",), len(track_index)
+
+
+def _cache_hit_ratio_gauges():
+    yield ("url",), url_cache.stats()["hitRatio"]
+    yield ("suggestions",), suggestion_index.stats()["hitRatio"]
+    yield ("tracks",), track_index.stats()["hitRatio"]
+
+
+def _queue_depth_gauges():
+    yield (upstream.metadata_pool.name,), upstream.metadata_pool.pending
+    yield (upstream.extract_pool.name,), upstream.extract_pool.pending
+    if prefetcher is not None:
+        yield ("prefetch",), prefetcher.stats()["pending"]
+
+
+def _governor_limit_gauges():
+    for governor in (upstream.ytmusic_governor, upstream.ytdlp_governor):
+        yield (governor.name,), round(governor.limiter.limit, 2)
+
+
+def _breaker_open_gauges():
+    for governor in (upstream.ytmusic_governor, upstream.ytdlp_governor):
+        yield (governor.name,), 0 if governor.breaker.state == "closed" else 1
+
+
+metrics.Gauge("ytmusic_upstream_concurrency_limit", "업스트림별 적응형 동시 실행 한도", ("upstream",), _governor_limit_gauges)
+metrics.Gauge("ytmusic_upstream_breaker_open", "서킷 브레이커 열림 여부 (1: 열림/시험 중)", ("upstream",), _breaker_open_gauges)
+metrics.Gauge("ytmusic_cache_entries", "캐시 항목 수", ("cache",), _cache_gauges)
+metrics.Gauge("ytmusic_cache_hit_ratio", "캐시 적중률", ("cache",), _cache_hit_ratio_gauges)
+metrics.Gauge("ytmusic_executor_queue_depth", "실행 풀 대기/실행 중 작업 수", ("pool",), _queue_depth_gauges)
+
+
+@app.get("/metrics", response_class=PlainTextResponse)
+async def get_metrics():
+    return PlainTextResponse(metrics.render(), media_type="text/plain; version=0.0.4")
+
+
+profiler = SamplingProfiler()
+
+
+@app.get("/api/debug/profile", response_class=PlainTextResponse)
+async def run_profiler(
+    seconds: float = Query(10, gt=0, le=120, description="샘플링 시간 (초)"),
+    interval_ms: int = Query(10, ge=1, le=1000, description="샘플링 간격 (ms)")
+):
+    """실행 중인 서버의 스택을 샘플링해서 collapsed stack(flamegraph) 형식으로 반환"""
+    if not config.PROFILER_ENABLED:
+        raise HTTPException(status_code=404, detail="프로파일러가 비활성화되어 있습니다 (PROFILER_ENABLED)")
+    if profiler.running:
+        raise HTTPException(status_code=409, detail="이미 프로파일링 중입니다")
+    # 샘플링 스레드는 업스트림 풀과 별개로 실행 (이벤트 루프 스레드도 샘플링 대상)
+    samples, stacks = await asyncio.to_thread(profiler.sample, seconds, interval_ms / 1000)
+    return PlainTextResponse(f"# samples={samples}\n" + render_collapsed(stacks))
+
+
+# 검색 결과 캐시 ((정규화된 검색어, limit) 단위)와 검색어 추천 접두사 색인
+search_cache = ResponseCache(max_entries=config.SEARCH_CACHE_MAX_ENTRIES, max_stale=0)
+suggestion_index = SuggestionIndex(
+    max_terms=config.SUGGESTION_INDEX_MAX_TERMS,
+    ttl=config.SUGGESTION_CACHE_TTL,
+    min_results=config.SUGGESTION_MIN_LOCAL_RESULTS
+)
+
+
+async def _search_tracks(q, limit):
+    results = await call_ytmusic("search", q, filter="songs", limit=limit, ignore_spelling=True)
+    tracks = [track_from_item(item) for item in results]
+    track_index.add_tracks(tracks)
+    return tracks
+
+
 @app.get("/api/search")
 async def search_music(
     q: str = Query(..., description="검색 쿼리"),
     limit: int = Query(20, ge=1, le=50, description="결과 개수")
 ):
     try:
-        results = ytmusic.search(q, filter="songs", limit=limit, ignore_spelling=True)
-        
-        songs = []
-        for item in results:
-            thumbnail = ""
-            if item.get("thumbnails"):
-                thumbnail = item["thumbnails"][-1]["url"]
-            
-            artists = []
-            if item.get("artists"):
-                artists = [artist["name"] for artist in item["artists"]]
-            
-            album = ""
-            if item.get("album"):
-                album = item["album"]["name"]
-            
-            duration = item.get("duration", "0:00")
-            
-            song = {
-                "id": item.get("videoId", ""),
-                "title": item.get("title", ""),
-                "artist": ", ".join(artists) if artists else "Unknown Artist",
-                "album": album or "Unknown Album",
-                "thumbnail": thumbnail,
-                "duration": duration,
-                "videoId": item.get("videoId", "")
-            }
-            songs.append(song)
+        key = f"{normalize_query(q)}|{limit}"
+        songs = await search_cache.get(key, config.SEARCH_CACHE_TTL, lambda: _search_tracks(q, limit))
+        # 실제 검색어는 추천 색인에 반영 (많이 검색될수록 앞에 표시)
+        suggestion_index.add_term(q)
         
-        return {"results": songs, "count": len(songs)}
+        schedule_prefetch(songs)
+        return FastJSONResponse({"results": songs, "count": len(songs)})
     
     except Exception as e:
-        raise HTTPException(status_code=500, detail=f"검색 중 오류 발생: {str(e)}")
+        raise upstream_error(e, "검색 중 오류 발생")
 
 
 @app.get("/api/search/suggestions")
@@ -98,63 +345,34 @@ async def get_search_suggestions(
     q: str = Query(..., description="검색 쿼리")
 ):
     try:
-        suggestions = ytmusic.get_search_suggestions(q, detailed_runs=False)
+        # 자주 입력되는 접두사는 색인에서 바로 응답
+        suggestions = suggestion_index.lookup(q)
+        if suggestions is None:
+            suggestions = await call_ytmusic("get_search_suggestions", q, detailed_runs=False)
+            suggestion_index.add_response(q, suggestions)
         return {"results": suggestions}
     except Exception as e:
-        return {"results": []}
+        logger.warning("검색어 추천 조회 실패: %s", e)
+        metrics.handled_errors.inc("search_suggestions")
+        return fallback_response({"results": []})
 
 
 @app.get("/api/charts")
 async def get_charts(
-    limit: int = Query(20, ge=1, le=50, description="결과 개수")
+    limit: int = Query(20, ge=1, le=50, description="결과 개수"),
+    country: str = Query(config.CHART_COUNTRIES[0], description="국가 코드")
 ):
     try:
-        # 한국 차트 사용
-        charts = ytmusic.get_charts(country="KR")
-        
-        songs = []
-        
-        # daily 차트 우선 (한국 인기곡 Top100)
-        chart_playlist_id = None
-        if charts and "daily" in charts and len(charts["daily"]) > 0:
-            chart_playlist_id = charts["daily"][0].get("playlistId")
-        # daily가 없으면 weekly 사용
-        elif charts and "weekly" in charts and len(charts["weekly"]) > 0:
-            chart_playlist_id = charts["weekly"][0].get("playlistId")
-        
-        if chart_playlist_id:
-            playlist = ytmusic.get_playlist(chart_playlist_id, limit=limit)
-            
-            if playlist.get("tracks"):
-                for track in playlist["tracks"][:limit]:
-                    track_thumbnail = ""
-                    if track.get("thumbnails"):
-                        track_thumbnail = track["thumbnails"][-1]["url"]
-                    
-                    artists = []
-                    if track.get("artists"):
-                        artists = [artist["name"] for artist in track["artists"]]
-                    
-                    album = ""
-                    if track.get("album"):
-                        album = track["album"]["name"]
-                    
-                    song = {
-                        "id": track.get("videoId", ""),
-                        "title": track.get("title", ""),
-                        "artist": ", ".join(artists) if artists else "Unknown Artist",
-                        "album": album or "Chart",
-                        "thumbnail": track_thumbnail,
-                        "duration": track.get("duration", "0:00"),
-                        "videoId": track.get("videoId", "")
-                    }
-                    songs.append(song)
-        
-        return {"results": songs, "count": len(songs)}
+        snapshot = await get_chart_snapshot(country)
+        songs = snapshot.songs[:limit]
+        schedule_prefetch(songs)
+        return FastJSONResponse({"results": songs, "count": len(songs), "version": snapshot.version})
     
+    except HTTPException:
+        raise
     except Exception as e:
-        traceback.print_exception(e)
-        raise HTTPException(status_code=500, detail=f"차트 조회 중 오류 발생: {str(e)}")
+        logger.exception("차트 조회 실패")
+        raise upstream_error(e, "차트 조회 중 오류 발생")
 
 
 @app.get("/api/playlists/featured")
@@ -162,7 +380,7 @@ async def get_featured_playlists(
     limit: int = Query(10, ge=1, le=20, description="결과 개수")
 ):
     try:
-        home = ytmusic.get_home(limit=50)
+        home = await cached_ytmusic("home", config.HOME_CACHE_TTL, "get_home", limit=50)
         
         playlists = []
         # '나를 위한 추천 재생목록' 섹션 찾기
@@ -178,9 +396,7 @@ async def get_featured_playlists(
                     # playlistId가 있고, 비디오가 아닌 실제 플레이리스트만 추가
                     # RDAM, RDAMVM으로 시작하는 것은 라디오/믹스이므로 제외
                     if playlist_id and not playlist_id.startswith("RDAM"):
-                        thumbnail = ""
-                        if item.get("thumbnails"):
-                            thumbnail = item["thumbnails"][-1]["url"]
+                        thumbnail = thumbnail_url(item)
                         
                         # description 필드 사용
                         description = item.get("description", "")
@@ -204,290 +420,525 @@ async def get_featured_playlists(
         return {"results": playlists, "count": len(playlists)}
     
     except Exception as e:
-        traceback.print_exception(e)
-        raise HTTPException(status_code=500, detail=f"플레이리스트 조회 중 오류 발생: {str(e)}")
+        logger.exception("플레이리스트 조회 실패")
+        raise upstream_error(e, "플레이리스트 조회 중 오류 발생")
+
+
+# 플레이리스트 전체 트랙 목록(헤더 + Track) 캐시 (커서 페이지네이션, NDJSON 스트리밍에서 공유)
+# 첫 페이지 JSON 응답은 이 목록을 만들지 않고, 커서로 다음 페이지를 요청할 때 처음 받는다
+playlist_snapshots = ResponseCache(
+    max_entries=config.PLAYLIST_SNAPSHOT_MAX_ENTRIES,
+    max_stale=0
+)
+
+# 업스트림 한 페이지 크기 (ytmusicapi는 100곡 단위로 가져옴)
+PLAYLIST_UPSTREAM_PAGE = 100
+
+
+async def _fetch_playlist(playlist_id):
+    """전체 트랙 목록을 받아 헤더와 Track 목록으로 보관 (페이지마다 다시 변환하지 않음)"""
+    playlist = await call_ytmusic("get_playlist", playlist_id, limit=config.PLAYLIST_MAX_TRACKS)
+    tracks = [track_from_item(track) for track in playlist.get("tracks") or []]
+    track_index.add_tracks(tracks)
+    return {"header": _playlist_header(playlist_id, playlist), "tracks": tracks}
+
+
+def _load_playlist_snapshot(playlist_id):
+    return lambda: _fetch_playlist(playlist_id)
+
+
+async def get_playlist_snapshot(playlist_id):
+    return await playlist_snapshots.get(
+        playlist_id, config.PLAYLIST_SNAPSHOT_TTL, _load_playlist_snapshot(playlist_id)
+    )
+
+
+def encode_cursor(offset):
+    return base64.urlsafe_b64encode(f"o:{offset}".encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor):
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        prefix, offset = base64.urlsafe_b64decode(padded).decode().split(":", 1)
+        if prefix != "o" or int(offset) < 0:
+            raise ValueError(cursor)
+        return int(offset)
+    except Exception:
+        raise HTTPException(status_code=400, detail="잘못된 커서입니다")
+
+
+def _playlist_header(playlist_id, playlist):
+    return {
+        "id": playlist_id,
+        "title": playlist.get("title", ""),
+        "description": playlist.get("description", ""),
+        "thumbnail": thumbnail_url(playlist),
+        "trackCount": playlist.get("trackCount"),
+    }
 
 
 @app.get("/api/playlists/{playlist_id}")
 async def get_playlist(
     playlist_id: str,
-    limit: int = Query(50, ge=1, le=100, description="트랙 개수")
+    limit: int = Query(50, ge=1, le=100, description="트랙 개수 (페이지 크기)"),
+    cursor: Optional[str] = Query(None, description="이전 응답의 nextCursor"),
+    stream: bool = Query(False, description="트랙을 받는 대로 NDJSON으로 전송 (커서 위치부터 끝까지)")
 ):
+    offset = decode_cursor(cursor) if cursor else 0
+
+    if stream:
+        return StreamingResponse(_stream_playlist(playlist_id, offset), media_type="application/x-ndjson")
+
     try:
-        playlist = ytmusic.get_playlist(playlist_id, limit=limit)
-        
-        thumbnail = ""
-        if playlist.get("thumbnails"):
-            thumbnail = playlist["thumbnails"][-1]["url"]
-        
-        tracks = []
-        if playlist.get("tracks"):
-            for track in playlist["tracks"]:
-                track_thumbnail = ""
-                if track.get("thumbnails"):
-                    track_thumbnail = track["thumbnails"][-1]["url"]
-                
-                artists = []
-                if track.get("artists"):
-                    artists = [artist["name"] for artist in track["artists"]]
-                
-                album = ""
-                if track.get("album"):
-                    album = track["album"]["name"]
-                
-                song = {
-                    "id": track.get("videoId", ""),
-                    "title": track.get("title", ""),
-                    "artist": ", ".join(artists) if artists else "Unknown Artist",
-                    "album": album or "Unknown Album",
-                    "thumbnail": track_thumbnail,
-                    "duration": track.get("duration", "0:00"),
-                    "videoId": track.get("videoId", "")
-                }
-                tracks.append(song)
+        if offset == 0 and playlist_snapshots.peek(playlist_id) is None:
+            # 첫 페이지는 업스트림 한 페이지만 받아서 바로 응답.
+            # 전체 목록은 커서로 다음 페이지를 실제로 요청할 때 받는다
+            # 한 곡 더 받아서 다음 페이지가 있는지 판단 (trackCount가 없는 플레이리스트도 있음)
+            playlist = await call_ytmusic("get_playlist", playlist_id, limit=limit + 1)
+            header = _playlist_header(playlist_id, playlist)
+            items = playlist.get("tracks") or []
+            has_more = len(items) > limit
+            tracks = [track_from_item(track) for track in items[:limit]]
+            # 전체 목록(_fetch_playlist)을 거치지 않은 곡도 /api/songs 조회에 쓸 수 있게 색인
+            track_index.add_tracks(tracks)
+        else:
+            snapshot = await get_playlist_snapshot(playlist_id)
+            header = snapshot["header"]
+            tracks = snapshot["tracks"][offset:offset + limit]
+            has_more = len(snapshot["tracks"]) > offset + limit
         
-        return {
-            "id": playlist_id,
-            "title": playlist.get("title", ""),
-            "description": playlist.get("description", ""),
-            "thumbnail": thumbnail,
+        schedule_prefetch(tracks)
+        response = dict(header)
+        response.update({
             "tracksCount": len(tracks),
-            "tracks": tracks
-        }
+            "tracks": tracks,
+            "nextCursor": encode_cursor(offset + limit) if has_more else None
+        })
+        return FastJSONResponse(response)
     
     except Exception as e:
-        raise HTTPException(status_code=500, detail=f"플레이리스트 조회 중 오류 발생: {str(e)}")
+        raise upstream_error(e, "플레이리스트 조회 중 오류 발생")
+
+
+def _ndjson(item):
+    return dumps(item) + b"\n"
+
+
+async def _stream_playlist(playlist_id, offset):
+    """NDJSON: playlist 헤더 한 줄, track 한 줄씩, 마지막에 end (오류 시 error)"""
+    sent = offset
+    header_sent = False
+    try:
+        if offset == 0 and playlist_snapshots.peek(playlist_id) is None:
+            # 전체 목록을 백그라운드에서 받기 시작하고, 그동안 첫 페이지를 먼저 전송
+            playlist_snapshots.refresh(playlist_id, _load_playlist_snapshot(playlist_id))
+            first = await call_ytmusic("get_playlist", playlist_id, limit=PLAYLIST_UPSTREAM_PAGE)
+            yield _ndjson({"type": "playlist", **_playlist_header(playlist_id, first)})
+            header_sent = True
+            tracks = [track_from_item(item) for item in first.get("tracks") or []]
+            track_index.add_tracks(tracks)
+            for track in tracks:
+                yield _ndjson({"type": "track", **dataclasses.asdict(track)})
+                sent += 1
+            total = first.get("trackCount")
+            if total is not None and sent >= total:
+                yield _ndjson({"type": "end", "count": sent})
+                return
+
+        snapshot = await get_playlist_snapshot(playlist_id)
+        if not header_sent:
+            yield _ndjson({"type": "playlist", **snapshot["header"]})
+        for track in snapshot["tracks"][sent:]:
+            yield _ndjson({"type": "track", **dataclasses.asdict(track)})
+            sent += 1
+        yield _ndjson({"type": "end", "count": sent - offset})
+    except Exception as e:
+        logger.exception("플레이리스트 스트리밍 실패: %s", playlist_id)
+        yield _ndjson({"type": "error", "error": f"플레이리스트 조회 중 오류 발생: {str(e)}"})
+
+
+class StreamUnavailable(Exception):
+    pass
+
+
+def is_video_failure(error):
+    """곡 자체의 문제(URL 없음, 비공개/삭제/지역 제한 영상)인지.
+
+    호출 제어 차단, 시간 초과, 연결 오류처럼 다시 시도하면 될 수 있는 실패는 제외한다.
+    """
+    return isinstance(error, (StreamUnavailable, ExtractionError)) and not is_upstream_failure(error)
+
+
+# 같은 video_id에 대한 동시 요청은 한 번의 조회/추출로 합친다
+song_flight = SingleFlight()
+extract_flight = SingleFlight(negative_ttl=config.NEGATIVE_CACHE_SECONDS, remember=is_video_failure)
+# 스트리밍 URL을 얻지 못한 곡의 조회 결과 전체를 잠시 기억 (메타데이터/가사 호출도 반복하지 않음)
+unavailable_songs = TTLCache(max_entries=1024, default_ttl=config.NEGATIVE_CACHE_SECONDS)
+
+
+async def _extract_stream(video_id):
+    info = await upstream.extract_info(video_id)
+    if not info or not info.get('url'):
+        raise StreamUnavailable(f"스트리밍 URL을 찾을 수 없습니다: {video_id}")
+    return info
 
 
 @app.get("/api/songs/{video_id}")
 async def get_song(video_id: str):
     try:
-        audio_url = None
-        title = ""
-        artist = "Unknown Artist"
-        thumbnail = ""
-        duration = "0"
-        
-        # 캐시 확인
-        now = datetime.now()
-        if video_id in url_cache:
-            cached = url_cache[video_id]
-            if cached['expires_at'] > now:
-                # 캐시된 URL 사용 (매우 빠름!)
-                audio_url = cached['url']
-                title = cached.get('title', '')
-                artist = cached.get('artist', 'Unknown Artist')
-                thumbnail = cached.get('thumbnail', '')
-                duration = cached.get('duration', '0')
-                lyrics_browse_id = cached.get('lyricsBrowseId')
-            else:
-                # 만료된 캐시 삭제
-                del url_cache[video_id]
-        
-        # 캐시 미스 - yt-dlp로 추출
-        if not audio_url:
+        return await song_flight.do(video_id, lambda: resolve_song(video_id))
+    except Exception as e:
+        logger.exception("노래 정보 조회 실패: %s", video_id)
+        raise upstream_error(e, "노래 정보 조회 중 오류 발생")
+
+
+async def resolve_stream_url(video_id):
+    """(스트리밍 URL, yt-dlp가 그 URL에 쓰라고 준 HTTP 헤더)"""
+    cached = await url_cache.load(video_id)
+    if cached is None or not cached.get('url'):
+        song = await song_flight.do(video_id, lambda: resolve_song(video_id))
+        cached = url_cache.peek(video_id) or {}
+        return song['streamUrl'], cached.get('httpHeaders')
+    return cached['url'], cached.get('httpHeaders')
+
+
+def invalidate_stream_url(video_id):
+    """만료된 URL만 버린다 - 메타데이터와 가사 browse ID는 남겨 두고 다음 조회에서 URL만 다시 추출"""
+    cached = url_cache.peek(video_id)
+    if cached is not None:
+        url_cache.set(video_id, {**cached, 'url': None, 'httpHeaders': None}, expires_at=url_cache.expires_at(video_id))
+
+
+# 오디오 프록시 (STREAM_PROXY_ENABLED) - URL 만료/IP 불일치를 서버에서 처리
+stream_proxy = StreamProxy(
+    resolve=resolve_stream_url,
+    invalidate=invalidate_stream_url,
+    chunk_size=config.STREAM_PROXY_CHUNK_SIZE,
+    max_connections=config.STREAM_PROXY_MAX_CONNECTIONS,
+    timeout=config.STREAM_PROXY_TIMEOUT
+)
+
+
+@app.get("/api/stream/{video_id}")
+async def stream_audio(video_id: str, request: Request):
+    if not config.STREAM_PROXY_ENABLED:
+        raise HTTPException(status_code=404, detail="오디오 프록시가 비활성화되어 있습니다 (STREAM_PROXY_ENABLED)")
+    try:
+        return await stream_proxy.open(video_id, request.headers.get("range"))
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.exception("오디오 프록시 실패: %s", video_id)
+        if isinstance(e, UpstreamUnavailable):
+            raise upstream_error(e, "오디오 스트림 조회 중 오류 발생")
+        raise HTTPException(status_code=502, detail=f"오디오 스트림 조회 중 오류 발생: {str(e)}")
+
+
+# 재생 대기열 URL 임대 - 대기열 앞쪽 곡의 URL을 미리 보내고 만료 전에 교체
+lease_manager = LeaseManager(
+    resolve=lambda video_id: song_flight.do(video_id, lambda: resolve_song(video_id)),
+    cache_expires_at=url_cache.expires_at,
+    url_expiry=stream_url_expiry,
+    lookahead=config.LEASE_LOOKAHEAD,
+    jitter=config.LEASE_REFRESH_JITTER,
+    retry_delay=config.NEGATIVE_CACHE_SECONDS,
+    default_ttl=config.URL_CACHE_DEFAULT_TTL
+)
+
+
+@app.websocket("/ws/queue")
+async def queue_channel(websocket: WebSocket):
+    """
+    대기열 URL 임대 채널
+    클라이언트: {"type": "queue", "videoIds": [...]} (재생 중인 곡부터, 바뀔 때마다 다시 전송)
+    서버: 앞쪽 LEASE_LOOKAHEAD곡마다 {"type": "lease", "videoId", "streamUrl", "expiresAt", "refreshAt", "song"}
+    """
+    await websocket.accept()
+    session = lease_manager.open(lambda message: websocket.send_text(dumps(message).decode()))
+    try:
+        while True:
             try:
-                youtube_url = f"https://music.youtube.com/watch?v={video_id}"
-                
-                # 전역 ydl 인스턴스 사용 (캐싱 활용)
-                info = ydl.extract_info(youtube_url, download=False)
-                
-                if info:
-                    audio_url = info.get('url')
-                    title = info.get('title', '')
-                    # yt-dlp에서 가져온 정보 사용
-                    if info.get('thumbnail'):
-                        thumbnail = info['thumbnail']
-                    if info.get('duration'):
-                        duration = str(int(info['duration']))
-                    if info.get('uploader'):
-                        artist = info['uploader']
-                    
-                    # 캐시에 저장 (5시간 유효) - lyrics_browse_id는 나중에 추가
-                    if audio_url:
-                        url_cache[video_id] = {
-                            'url': audio_url,
-                            'title': title,
-                            'artist': artist,
-                            'thumbnail': thumbnail,
-                            'duration': duration,
-                            'lyricsBrowseId': None,  # 나중에 업데이트
-                            'expires_at': now + timedelta(hours=5)
-                        }
-                        
-            except Exception as e:
-                audio_url = None
-        
-        # 2. ytmusicapi로 메타데이터 보완 (yt-dlp가 실패하거나 메타데이터가 부족한 경우)
-        lyrics_browse_id = None
-        try:
-            song = ytmusic.get_song(video_id)
-            video_details = song.get("videoDetails", {})
-            
-            # yt-dlp에서 가져오지 못한 정보만 보완
-            if not title:
-                title = video_details.get("title", "")
-            if artist == "Unknown Artist":
-                artist = video_details.get("author", "Unknown Artist")
-            if not thumbnail and video_details.get("thumbnail", {}).get("thumbnails"):
-                thumbnails = video_details["thumbnail"]["thumbnails"]
-                if thumbnails:
-                    thumbnail = thumbnails[-1]["url"]
-            if duration == "0":
-                duration = video_details.get("lengthSeconds", "0")
-            
-            # 가사 browse ID 가져오기 - get_watch_playlist 사용
-            if lyrics_browse_id is None:  # 캐시에 없으면 가져오기
-                try:
-                    watch_playlist = ytmusic.get_watch_playlist(videoId=video_id)
-                    lyrics_browse_id = watch_playlist.get('lyrics')
-                    
-                    # 캐시에 lyrics_browse_id 업데이트
-                    if video_id in url_cache:
-                        url_cache[video_id]['lyricsBrowseId'] = lyrics_browse_id
-                except Exception as lyrics_error:
-                    pass
-        except Exception as meta_error:
-            pass
-        
-        return {
-            "id": video_id,
-            "title": title,
-            "artist": artist,
-            "thumbnail": thumbnail,
-            "duration": duration,
-            "streamUrl": audio_url,  # yt-dlp가 서명 해결한 URL
-            "videoId": video_id,
-            "lyricsBrowseId": lyrics_browse_id  # 가사 browse ID 추가
-        }
+                message = await websocket.receive_json()
+            except (ValueError, KeyError):
+                # KeyError: 바이너리 프레임 (receive_json은 텍스트 프레임만 읽음)
+                await session.send({"type": "error", "error": "JSON 텍스트 메시지가 아닙니다"})
+                continue
+            if not isinstance(message, dict) or message.get("type") != "queue" or not isinstance(message.get("videoIds"), list):
+                await session.send({"type": "error", "error": "지원하지 않는 메시지입니다"})
+                continue
+            leased = session.update(message["videoIds"])
+            await session.send({"type": "queue", "leased": leased})
+    except WebSocketDisconnect:
+        pass
+    finally:
+        session.close()
 
-    
+
+class SongBatchRequest(BaseModel):
+    videoIds: List[str] = Field(..., min_length=1, description="조회할 video ID 목록")
+
+
+async def _resolve_batch_entry(video_id):
+    try:
+        song = await song_flight.do(video_id, lambda: resolve_song(video_id))
     except Exception as e:
-        traceback.print_exc()
-        raise HTTPException(status_code=500, detail=f"노래 정보 조회 중 오류 발생: {str(e)}")
+        return {"videoId": video_id, "status": "error", "song": None, "error": str(e)}
+    status = "ok" if song.get("streamUrl") else "unavailable"
+    return {"videoId": video_id, "status": status, "song": song, "error": None}
+
+
+@app.post("/api/songs/batch")
+async def get_songs_batch(
+    request: SongBatchRequest,
+    stream: bool = Query(False, description="완료되는 순서대로 NDJSON으로 전송")
+):
+    # 중복 제거 (순서 유지)
+    video_ids = list(dict.fromkeys(request.videoIds))
+    if len(video_ids) > config.SONG_BATCH_MAX_SIZE:
+        raise HTTPException(
+            status_code=400,
+            detail=f"한 번에 최대 {config.SONG_BATCH_MAX_SIZE}곡까지 조회할 수 있습니다"
+        )
+
+    # 모든 곡을 동시에 조회 (캐시/추출 경로는 get_song과 동일)
+    tasks = [asyncio.ensure_future(_resolve_batch_entry(video_id)) for video_id in video_ids]
+
+    if stream:
+        async def generate():
+            try:
+                for next_done in asyncio.as_completed(tasks):
+                    entry = await next_done
+                    yield _ndjson(entry)
+            finally:
+                for task in tasks:
+                    task.cancel()
+
+        return StreamingResponse(generate(), media_type="application/x-ndjson")
+
+    results = await asyncio.gather(*tasks)
+    return {"results": results, "count": len(results)}
+
+
+def _song_fields_missing(song):
+    return (
+        not song['title']
+        or song['artist'] == "Unknown Artist"
+        or not song['thumbnail']
+        or song['duration'] == "0"
+    )
+
+
+def _merge_video_details(song, video_details):
+    # yt-dlp에서 가져오지 못한 정보만 보완
+    if not song['title']:
+        song['title'] = video_details.get("title", "")
+    if song['artist'] == "Unknown Artist":
+        song['artist'] = video_details.get("author", "Unknown Artist")
+    if not song['thumbnail'] and video_details.get("thumbnail", {}).get("thumbnails"):
+        thumbnails = video_details["thumbnail"]["thumbnails"]
+        if thumbnails:
+            song['thumbnail'] = thumbnails[-1]["url"]
+    if song['duration'] == "0":
+        song['duration'] = video_details.get("lengthSeconds", "0")
+
+
+def _merge_extracted_info(song, info):
+    if not song['title']:
+        song['title'] = info.get('title') or ''
+    if not song['thumbnail'] and info.get('thumbnail'):
+        song['thumbnail'] = info['thumbnail']
+    if song['duration'] == "0" and info.get('duration'):
+        song['duration'] = str(int(info['duration']))
+    if song['artist'] == "Unknown Artist" and info.get('uploader'):
+        song['artist'] = info['uploader']
+
+
+async def _fetch_video_details(video_id):
+    song = await call_ytmusic("get_song", video_id)
+    return song.get("videoDetails", {})
+
+
+async def _fetch_lyrics_browse_id(video_id):
+    # 가사 browse ID 가져오기 - get_watch_playlist 사용
+    watch_playlist = await call_ytmusic("get_watch_playlist", videoId=video_id)
+    return watch_playlist.get('lyrics')
+
+
+async def _skip():
+    return None
+
+
+def _song_response(video_id, song):
+    return {
+        "id": video_id,
+        "title": song['title'],
+        "artist": song['artist'],
+        "thumbnail": song['thumbnail'],
+        "duration": song['duration'],
+        "streamUrl": song['url'],  # yt-dlp가 서명 해결한 URL
+        "videoId": video_id,
+        "lyricsBrowseId": song.get('lyricsBrowseId')  # 가사 browse ID
+    }
+
+
+async def resolve_song(video_id):
+    cached = await url_cache.load(video_id)
+
+    # 빠른 경로: 스트리밍 URL, 메타데이터, 가사 browse ID가 모두 캐시에 있으면 업스트림 호출 없음
+    has_url = cached is not None and bool(cached.get('url'))
+    if has_url and cached.get('lyricsLoaded') and not _song_fields_missing(cached):
+        return _song_response(video_id, cached)
+    if cached is None:
+        remembered = unavailable_songs.get(video_id)
+        if remembered is not None:
+            return remembered
+
+    known = None
+    if cached is not None:
+        song = dict(cached)
+        song.setdefault('lyricsLoaded', False)
+    else:
+        song = {
+            'url': None,
+            'title': "",
+            'artist': "Unknown Artist",
+            'thumbnail': "",
+            'duration': "0",
+            'lyricsBrowseId': None,
+            'lyricsLoaded': False,
+        }
+        # 목록 응답에서 본 곡이면 그 메타데이터를 사용하고 get_song은 부족할 때만 호출
+        known = track_index.get(video_id)
+        if known is not None:
+            song.update(title=known.title, artist=known.artist, thumbnail=known.thumbnail, duration=known.duration)
+
+    # 필요한 것만 동시에 조회: yt-dlp 추출, ytmusicapi 메타데이터, 가사 browse ID
+    info, video_details, lyrics_browse_id = await asyncio.gather(
+        # 추출 전용 풀에서 실행, 동시 요청 및 최근 실패는 공유
+        extract_flight.do(video_id, lambda: _extract_stream(video_id)) if not has_url else _skip(),
+        _fetch_video_details(video_id) if (cached is None and known is None) or _song_fields_missing(song) else _skip(),
+        _fetch_lyrics_browse_id(video_id) if not song['lyricsLoaded'] else _skip(),
+        return_exceptions=True
+    )
+
+    for name, result in (("extract_info", info), ("get_song", video_details), ("get_watch_playlist", lyrics_browse_id)):
+        if isinstance(result, BaseException):
+            logger.warning("%s 실패 (%s): %r", name, video_id, result)
+
+    if info and not isinstance(info, BaseException):
+        song['url'] = info.get('url')
+        # 서명된 URL은 추출할 때의 User-Agent 등으로 요청해야 하므로 함께 보관 (오디오 프록시에서 사용)
+        song['httpHeaders'] = info.get('http_headers')
+        if cached is None and known is None:
+            song['title'] = info.get('title') or ''
+            # yt-dlp에서 가져온 정보 사용
+            if info.get('thumbnail'):
+                song['thumbnail'] = info['thumbnail']
+            if info.get('duration'):
+                song['duration'] = str(int(info['duration']))
+            if info.get('uploader'):
+                song['artist'] = info['uploader']
+        else:
+            # 목록/캐시 메타데이터가 우선, 비어 있는 필드만 yt-dlp 정보로 채움
+            _merge_extracted_info(song, info)
+
+    # ytmusicapi로 메타데이터 보완 (yt-dlp가 실패하거나 메타데이터가 부족한 경우)
+    if video_details and not isinstance(video_details, BaseException):
+        _merge_video_details(song, video_details)
+
+    if not song['lyricsLoaded'] and not isinstance(lyrics_browse_id, BaseException):
+        song['lyricsBrowseId'] = lyrics_browse_id
+        song['lyricsLoaded'] = True
+
+    # 캐시에 저장 (URL의 만료 시각 기준)
+    if song['url']:
+        expires_at = url_cache.expires_at(video_id) if has_url else url_cache_expiry(song['url'])
+        url_cache.set(video_id, song, expires_at=expires_at)
+    elif is_video_failure(info) and current_priority() == INTERACTIVE:
+        # 곡 자체의 문제일 때만 기억 (차단/시간 초과나 미리 받기 중 실패는 다음 요청에서 다시 시도)
+        response = _song_response(video_id, song)
+        unavailable_songs.set(video_id, response)
+        return response
+
+    return _song_response(video_id, song)
+
+
+# 정규화한 가사 캐시 (browse_id: Lyrics) - 싱크 가사 시점 조회, LRC 변환에서 공유
+lyrics_cache = ResponseCache(max_entries=config.LYRICS_CACHE_MAX_ENTRIES, max_stale=0)
+
+
+async def _load_lyrics(browse_id):
+    return parse_lyrics(await call_ytmusic("get_lyrics", browse_id, timestamps=True))
+
+
+async def get_cached_lyrics(browse_id):
+    return await lyrics_cache.get(browse_id, config.LYRICS_CACHE_TTL, lambda: _load_lyrics(browse_id))
+
+
+def _lyrics_error(message):
+    return {
+        "lyrics": None,
+        "hasTimestamps": False,
+        "source": None,
+        "error": message
+    }
 
 
 @app.get("/api/lyrics/{browse_id}")
-async def get_lyrics(browse_id: str):
+async def get_lyrics(
+    browse_id: str,
+    at: Optional[int] = Query(None, ge=0, description="재생 위치 (ms) - 지정하면 그 시점의 줄과 앞뒤 줄만 반환"),
+    before: int = Query(1, ge=0, le=50, description="at 기준 앞쪽 줄 수"),
+    after: int = Query(2, ge=0, le=50, description="at 기준 뒤쪽 줄 수")
+):
     """
     Get lyrics for a song by browse ID
     browse_id should be the lyrics browse ID from the song metadata
     """
     try:
-        # Fetch lyrics directly
-        lyrics_data = ytmusic.get_lyrics(browse_id)
-        
-        if not lyrics_data:
-            return {
-                "lyrics": None,
-                "hasTimestamps": False,
-                "source": None,
-                "error": "가사를 찾을 수 없습니다"
-            }
-        
-        # Convert LyricLine objects to dictionaries if present
-        lyrics_lines = lyrics_data.get('lyrics', [])
-        
-        # Detect if lyrics have timestamps by checking the first line
-        has_timestamps = False
-        if isinstance(lyrics_lines, list) and len(lyrics_lines) > 0:
-            first_line = lyrics_lines[0]
-            # Check if the first line has start_time attribute
-            if hasattr(first_line, 'start_time') and first_line.start_time is not None:
-                has_timestamps = True
-        
-        # If lyrics is a list of LyricLine objects, convert to dict
-        if isinstance(lyrics_lines, list) and len(lyrics_lines) > 0:
-            lyrics_formatted = [
-                {
-                    "text": line.text if hasattr(line, 'text') else str(line),
-                    "startTime": line.start_time if hasattr(line, 'start_time') else None,
-                    "endTime": line.end_time if hasattr(line, 'end_time') else None,
-                    "id": line.id if hasattr(line, 'id') else None
-                }
-                for line in lyrics_lines
-            ]
-        elif isinstance(lyrics_lines, str):
-            # Plain text lyrics
-            lyrics_formatted = lyrics_lines
-            has_timestamps = False
-        else:
-            lyrics_formatted = None
-        
-        
-        return {
-            "lyrics": lyrics_formatted,
-            "hasTimestamps": has_timestamps,
-            "source": lyrics_data.get('source'),
-            "error": None
-        }
+        lyrics = await get_cached_lyrics(browse_id)
     except Exception as e:
-        print(f"Error fetching lyrics for {browse_id}: {str(e)}")
-        traceback.print_exc()
-        return {
-            "lyrics": None,
-            "hasTimestamps": False,
-            "source": None,
-            "error": f"가사를 가져오는 중 오류가 발생했습니다: {str(e)}"
-        }
+        logger.exception("가사 조회 실패: %s", browse_id)
+        metrics.handled_errors.inc("lyrics")
+        return fallback_response(_lyrics_error(f"가사를 가져오는 중 오류가 발생했습니다: {str(e)}"))
 
+    if not lyrics.found:
+        return _lyrics_error("가사를 찾을 수 없습니다")
+    if at is not None:
+        if not lyrics.has_timestamps:
+            return {**_lyrics_error("싱크 가사가 없습니다"), "source": lyrics.source}
+        return FastJSONResponse(lyrics.window(at, before=before, after=after))
+    return FastJSONResponse(lyrics.to_response())
+
+
+@app.get("/api/lyrics/{browse_id}/lrc", response_class=PlainTextResponse)
+async def get_lyrics_lrc(browse_id: str):
+    try:
+        lyrics = await get_cached_lyrics(browse_id)
+    except Exception as e:
+        logger.exception("가사 조회 실패: %s", browse_id)
+        raise upstream_error(e, "가사 조회 중 오류 발생")
+    if not lyrics.found:
+        raise HTTPException(status_code=404, detail="가사를 찾을 수 없습니다")
+    return lyrics.to_lrc()
 
 
 @app.get("/api/charts/list")
-async def get_chart_list():
+async def get_chart_list(
+    country: str = Query(config.CHART_COUNTRIES[0], description="국가 코드")
+):
     try:
-        # 한국 차트 목록 조회
-        charts = ytmusic.get_charts(country="KR")
-        
-        results = []
-        
-        # 차트 데이터 파싱
-        # charts는 {'countries': {...}, 'global': {...}, 'videos': {...}, 'artists': {...}} 형태일 수 있음
-        # 또는 바로 리스트일 수도 있음 (ytmusicapi 버전에 따라 다름)
-        
-        # 주요 차트 카테고리 순회
-        chart_categories = ["videos", "artists", "daily", "weekly", "trending"]
-        
-        for category in chart_categories:
-            if category in charts and charts[category]:
-                items = charts[category]
-                # items는 리스트 또는 딕셔너리
-                if isinstance(items, list):
-                    for item in items: # list limiting is handled in frontend or by nature of limited charts
-                        # playlistId가 있는 항목만 처리 (재생 가능한 차트)
-                        if "playlistId" in item:
-                            thumbnail = ""
-                            if item.get("thumbnails"):
-                                thumbnail = item["thumbnails"][-1]["url"]
-                            
-                            chart = {
-                                "id": int(datetime.now().timestamp() * 1000) + hash(item.get("playlistId")), # 임의 ID
-                                "title": item.get("title", f"Top Chart ({category})"),
-                                "country": "KR",
-                                "thumbnail": thumbnail,
-                                "songs": 100, # 대략적인 수치
-                                "playlistId": item.get("playlistId"),
-                                "params": item.get("params")
-                            }
-                            results.append(chart)
-
-        # 결과가 없으면 트렌딩 음악으로 기본 차트 구성 시도 (Fallback)
-        if not results:
-             results.append({
-                 "id": 1,
-                 "title": "한국 인기곡 Top 100",
-                 "country": "KR",
-                 "thumbnail": "https://music.youtube.com/img/trending/trending_1.png", # Fallback image
-                 "songs": 100,
-                 "playlistId": "PL4fGSI1pDJn6jXS_Ix_YyccC20CsxbklJ" # Default Top 100 KR ID
-             })
-             
-        return {"results": results}
+        snapshot = await get_chart_snapshot(country)
+        return FastJSONResponse({"results": snapshot.charts, "version": snapshot.version})
     
+    except HTTPException:
+        raise
     except Exception as e:
-        traceback.print_exception(e)
+        logger.exception("차트 목록 조회 실패")
+        metrics.handled_errors.inc("chart_list")
         # 오류 발생 시 빈 리스트 반환 (프론트엔드에서 처리)
-        return {"results": []}
+        return fallback_response({"results": []})
 
 
 @app.get("/api/moods/playlists")
@@ -496,35 +947,23 @@ async def get_mood_playlists(
 ):
     try:
         # 해당 무드/장르의 플레이리스트 조회
-        playlists = ytmusic.get_mood_playlists(params=params)
+        playlists = await cached_ytmusic(
+            f"mood_playlists:{params}", config.MOOD_PLAYLISTS_CACHE_TTL, "get_mood_playlists", params=params
+        )
         
-        results = []
-        for item in playlists:
-            thumbnail = ""
-            if item.get("thumbnails"):
-                thumbnail = item["thumbnails"][-1]["url"]
+        results = [playlist_from_item(item) for item in playlists]
             
-            playlist = {
-                "id": item.get("playlistId", ""),
-                "title": item.get("title", ""),
-                "description": item.get("description", ""),
-                "thumbnail": thumbnail,
-                "tracksCount": int(item.get("count", "0").split(" ")[0].replace(",", "")) if item.get("count") else 0,
-                "author": item.get("author", "")
-            }
-            results.append(playlist)
-            
-        return {"results": results}
+        return FastJSONResponse({"results": results})
         
     except Exception as e:
-        traceback.print_exception(e)
-        raise HTTPException(status_code=500, detail=f"플레이리스트 조회 중 오류 발생: {str(e)}")
+        logger.exception("플레이리스트 조회 실패")
+        raise upstream_error(e, "플레이리스트 조회 중 오류 발생")
 
 
 @app.get("/api/moods")
 async def get_mood_categories():
     try:
-        categories = ytmusic.get_mood_categories()
+        categories = await cached_ytmusic("moods", config.MOODS_CACHE_TTL, "get_mood_categories")
         
         # Transform into a more frontend-friendly format
         result = {}
@@ -539,21 +978,164 @@ async def get_mood_categories():
             
         return result
     except Exception as e:
-        print(f"Error fetching mood categories: {str(e)}")
+        logger.exception("무드 카테고리 조회 실패")
+        metrics.handled_errors.inc("mood_categories")
         # Fallback empty structure if API fails
-        return {}
+        return fallback_response({})
+
+
+# 무드/장르 전체 카탈로그 - 모든 카테고리 플레이리스트를 동시에 (MOOD_CATALOG_CONCURRENCY개씩) 조회
+# 카테고리별 결과는 /api/moods/playlists와 같은 응답 캐시를 공유하고, 모든 섹션이 성공한 문서는
+# 응답 캐시에 MOOD_CATALOG_CACHE_TTL 동안 저장 (stale-while-revalidate, 갱신이 실패하면 마지막 정상 문서)
+MOOD_CATALOG_KEY = "mood_catalog"
+
+
+class PartialCatalog(Exception):
+    """일부 섹션이 실패한 카탈로그 문서 - 캐시하지 않는다"""
+
+    def __init__(self, document):
+        super().__init__(f"무드 카탈로그 섹션 {document['failed']}개 조회 실패")
+        self.document = document
+
+
+async def _fetch_mood_section(semaphore, group, item):
+    params = item.get("params")
+    section = {"group": group, "title": item.get("title"), "params": params}
+    try:
+        async with semaphore:
+            playlists = await cached_ytmusic(
+                f"mood_playlists:{params}", config.MOOD_PLAYLISTS_CACHE_TTL, "get_mood_playlists", params=params
+            )
+        return {**section, "status": "ok", "playlists": [playlist_from_item(item) for item in playlists], "error": None}
+    except Exception as e:
+        logger.warning("무드 카탈로그 섹션 조회 실패 (%s): %r", params, e)
+        return {**section, "status": "error", "playlists": [], "error": str(e)}
+
+
+async def _mood_sections():
+    """(순서, 섹션)을 완료되는 순서대로 내보내고, 마지막에 (None, 카탈로그 문서)를 내보낸다"""
+    categories = await cached_ytmusic("moods", config.MOODS_CACHE_TTL, "get_mood_categories")
+    semaphore = asyncio.Semaphore(config.MOOD_CATALOG_CONCURRENCY)
+
+    async def fetch(order, group, item):
+        return order, await _fetch_mood_section(semaphore, group, item)
+
+    entries = [(group, item) for group, items in categories.items() for item in items]
+    tasks = [asyncio.ensure_future(fetch(order, group, item)) for order, (group, item) in enumerate(entries)]
+    sections = [None] * len(tasks)
+    try:
+        for next_done in asyncio.as_completed(tasks):
+            order, section = await next_done
+            sections[order] = section
+            yield order, section
+    finally:
+        for task in tasks:
+            task.cancel()
+    yield None, _mood_catalog_document(sections)
+
+
+def _mood_catalog_document(sections):
+    failed = sum(1 for section in sections if section["status"] != "ok")
+    return {
+        "sections": sections,
+        "count": len(sections),
+        "failed": failed,
+        "status": "partial" if failed else "complete"
+    }
+
+
+async def _load_mood_catalog():
+    async for order, item in _mood_sections():
+        if order is None:
+            document = item
+    if document["failed"]:
+        raise PartialCatalog(document)
+    return document
+
+
+def _catalog_end(document):
+    return {"type": "end", "count": document["count"], "failed": document["failed"], "status": document["status"]}
+
+
+async def _stream_mood_catalog():
+    try:
+        if response_cache.peek(MOOD_CATALOG_KEY) is not None:
+            # 캐시된 문서가 있으면 그대로 보낸다 (오래됐으면 백그라운드에서 갱신)
+            document = await response_cache.get(MOOD_CATALOG_KEY, config.MOOD_CATALOG_CACHE_TTL, _load_mood_catalog)
+            for order, section in enumerate(document["sections"]):
+                yield _ndjson({"type": "section", "order": order, **section})
+            yield _ndjson(_catalog_end(document))
+            return
+        async for order, item in _mood_sections():
+            if order is None:
+                document = item
+            else:
+                yield _ndjson({"type": "section", "order": order, **item})
+    except Exception as e:
+        logger.exception("무드 카탈로그 조회 실패")
+        yield _ndjson({"type": "error", "error": str(e)})
+        return
+    if not document["failed"]:
+        response_cache.set(MOOD_CATALOG_KEY, document)
+    yield _ndjson(_catalog_end(document))
+
+
+@app.get("/api/moods/catalog")
+async def get_mood_catalog(
+    stream: bool = Query(False, description="true면 완료되는 섹션부터 NDJSON으로 전송")
+):
+    if stream:
+        return StreamingResponse(_stream_mood_catalog(), media_type="application/x-ndjson")
+    try:
+        document = await response_cache.get(MOOD_CATALOG_KEY, config.MOOD_CATALOG_CACHE_TTL, _load_mood_catalog)
+        return FastJSONResponse(document)
+    except PartialCatalog as e:
+        # 마지막 정상 문서도 없을 때 - 실패한 섹션이 있는 문서는 클라이언트에도 남기지 않는다
+        return fallback_response(e.document)
+    except Exception as e:
+        logger.exception("무드 카탈로그 조회 실패")
+        raise upstream_error(e, "무드 카탈로그 조회 중 오류 발생")
+
+
+def _fast_loop():
+    try:
+        import uvloop  # noqa: F401
+        return "uvloop"
+    except ImportError:
+        return "auto"
+
+
+def _fast_http():
+    try:
+        import httptools  # noqa: F401
+        return "httptools"
+    except ImportError:
+        return "auto"
 
 
 if __name__ == "__main__":
+    import os
     import uvicorn
     
-    host = os.getenv("HOST", "0.0.0.0")
-    port = int(os.getenv("PORT", 8000))
-    
-    uvicorn.run(
-        "main:app",
-        host=host,
-        port=port,
-        reload=True,
-        log_level="info"
-    )
+    if config.PRODUCTION:
+        # 운영 모드: reload 없이 여러 워커, uvloop + httptools
+        # 워커 프로세스도 운영 모드 기본값(YTDLP_WORKERS 등)을 쓰도록 환경 변수로 넘긴다
+        os.environ["APP_ENV"] = "production"
+        uvicorn.run(
+            "main:app",
+            host=config.HOST,
+            port=config.PORT,
+            workers=config.WEB_CONCURRENCY,
+            loop=_fast_loop(),
+            http=_fast_http(),
+            access_log=False,
+            log_level="info"
+        )
+    else:
+        uvicorn.run(
+            "main:app",
+            host=config.HOST,
+            port=config.PORT,
+            reload=True,
+            log_level="info"
+        )
@@ -0,0 +1,148 @@
+# Prometheus 텍스트 형식으로 내보내는 간단한 지표 모음 (/metrics)
+# 모든 갱신은 이벤트 루프 스레드에서만 일어난다
+import time
+from contextlib import contextmanager
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)
+
+_registry = []
+
+
+def _format_labels(names, values, extra=()):
+    pairs = list(zip(names, values)) + list(extra)
+    if not pairs:
+        return ""
+    body = ",".join(f'{name}="{_escape(value)}"' for name, value in pairs)
+    return "{" + body + "}"
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+class Counter:
+    def __init__(self, name, help, labelnames=()):
+        self.name = name
+        self.help = help
+        self.labelnames = labelnames
+        self._values = {}
+        _registry.append(self)
+
+    def inc(self, *labels, amount=1):
+        self._values[labels] = self._values.get(labels, 0) + amount
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} counter"]
+        for labels, value in sorted(self._values.items()):
+            lines.append(f"{self.name}{_format_labels(self.labelnames, labels)} {value}")
+        return lines
+
+
+class Histogram:
+    def __init__(self, name, help, labelnames=(), buckets=DEFAULT_BUCKETS):
+        self.name = name
+        self.help = help
+        self.labelnames = labelnames
+        self.buckets = buckets
+        self._values = {}  # labels: [버킷별 개수..., 합계, 개수]
+        _registry.append(self)
+
+    def observe(self, *labels, value):
+        data = self._values.get(labels)
+        if data is None:
+            data = self._values[labels] = [0] * len(self.buckets) + [0.0, 0]
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                data[i] += 1
+        data[-2] += value
+        data[-1] += 1
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        for labels, data in sorted(self._values.items()):
+            for i, bound in enumerate(self.buckets):
+                lines.append(f"{self.name}_bucket{_format_labels(self.labelnames, labels, [('le', bound)])} {data[i]}")
+            lines.append(f"{self.name}_bucket{_format_labels(self.labelnames, labels, [('le', '+Inf')])} {data[-1]}")
+            lines.append(f"{self.name}_sum{_format_labels(self.labelnames, labels)} {data[-2]}")
+            lines.append(f"{self.name}_count{_format_labels(self.labelnames, labels)} {data[-1]}")
+        return lines
+
+
+class Gauge:
+    """수집 시점에 callback()이 돌려주는 [(레이블 튜플, 값), ...]을 내보낸다"""
+
+    def __init__(self, name, help, labelnames, callback):
+        self.name = name
+        self.help = help
+        self.labelnames = labelnames
+        self.callback = callback
+        _registry.append(self)
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} gauge"]
+        for labels, value in self.callback():
+            lines.append(f"{self.name}{_format_labels(self.labelnames, labels)} {value}")
+        return lines
+
+
+def render():
+    lines = []
+    for metric in _registry:
+        lines.extend(metric.render())
+    return "\n".join(lines) + "\n"
+
+
+upstream_duration = Histogram(
+    "ytmusic_upstream_call_duration_seconds", "업스트림(ytmusicapi, yt-dlp) 호출 시간", ("call",)
+)
+upstream_wait = Histogram(
+    "ytmusic_upstream_wait_seconds", "업스트림 호출이 호출 제어(동시 실행 한도, 속도 제한)에서 기다린 시간", ("call",)
+)
+upstream_errors = Counter(
+    "ytmusic_upstream_call_errors_total", "업스트림 호출 오류 수", ("call", "error")
+)
+request_duration = Histogram(
+    "ytmusic_http_request_duration_seconds", "라우트별 요청 처리 시간", ("method", "route", "status")
+)
+handled_errors = Counter(
+    "ytmusic_handled_errors_total", "라우트에서 처리(기록 후 대체 응답)한 오류 수", ("where",)
+)
+
+
+@contextmanager
+def time_upstream(call):
+    start = time.perf_counter()
+    try:
+        yield
+    except Exception as e:
+        upstream_errors.inc(call, type(e).__name__)
+        raise
+    finally:
+        upstream_duration.observe(call, value=time.perf_counter() - start)
+
+
+class RequestMetricsMiddleware:
+    """라우트(경로 템플릿)별 요청 처리 시간을 기록하는 ASGI 미들웨어"""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        start = time.perf_counter()
+        status = [500]
+
+        async def send_with_status(message):
+            if message["type"] == "http.response.start":
+                status[0] = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            route = scope.get("route")
+            path = getattr(route, "path", "unmatched")
+            request_duration.observe(scope["method"], path, str(status[0]), value=time.perf_counter() - start)
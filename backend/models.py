@@ -0,0 +1,97 @@
+import dataclasses
+import hashlib
+import json
+from dataclasses import dataclass
+
+from fastapi.responses import JSONResponse
+
+try:
+    import orjson
+except ImportError:  # orjson이 없으면 표준 json으로 대체
+    orjson = None
+
+
+@dataclass(slots=True)
+class Track:
+    """목록 응답(검색, 차트, 플레이리스트)에서 사용하는 곡 정보"""
+    id: str
+    title: str
+    artist: str
+    album: str
+    thumbnail: str
+    duration: str
+    videoId: str
+
+
+@dataclass(slots=True)
+class PlaylistSummary:
+    """무드/장르 플레이리스트 목록 항목"""
+    id: str
+    title: str
+    description: str
+    thumbnail: str
+    tracksCount: int
+    author: str
+
+
+def thumbnail_url(item):
+    """가장 큰(마지막) 썸네일 URL"""
+    thumbnails = item.get("thumbnails")
+    return thumbnails[-1]["url"] if thumbnails else ""
+
+
+def track_from_item(item, default_album="Unknown Album"):
+    """ytmusicapi의 곡 항목(검색 결과, 플레이리스트 트랙)을 Track으로 변환"""
+    artists = item.get("artists")
+    album = item.get("album")
+    video_id = item.get("videoId", "")
+    return Track(
+        id=video_id,
+        title=item.get("title", ""),
+        artist=", ".join(artist["name"] for artist in artists) if artists else "Unknown Artist",
+        album=(album["name"] if album else "") or default_album,
+        thumbnail=thumbnail_url(item),
+        duration=item.get("duration", "0:00"),
+        videoId=video_id
+    )
+
+
+def playlist_from_item(item):
+    """ytmusicapi의 무드/장르 플레이리스트 항목을 PlaylistSummary로 변환"""
+    count = item.get("count")
+    return PlaylistSummary(
+        id=item.get("playlistId", ""),
+        title=item.get("title", ""),
+        description=item.get("description", ""),
+        thumbnail=thumbnail_url(item),
+        tracksCount=int(count.split(" ")[0].replace(",", "")) if count else 0,
+        author=item.get("author", "")
+    )
+
+
+def stable_id(value):
+    """문자열에서 만든 정수 ID - 실행/프로세스가 달라도 같은 값 (JS 안전 정수 범위)"""
+    return int.from_bytes(hashlib.blake2b(value.encode("utf-8"), digest_size=6).digest(), "big")
+
+
+def _json_default(value):
+    if dataclasses.is_dataclass(value):
+        return dataclasses.asdict(value)
+    raise TypeError(f"{type(value).__name__} is not JSON serializable")
+
+
+def dumps(content):
+    """dict/list/Track 등을 JSON bytes로 직렬화"""
+    if orjson is not None:
+        return orjson.dumps(content, option=orjson.OPT_NON_STR_KEYS)
+    return json.dumps(content, ensure_ascii=False, separators=(",", ":"), default=_json_default).encode("utf-8")
+
+
+class FastJSONResponse(JSONResponse):
+    """FastAPI의 jsonable_encoder를 거치지 않고 바로 직렬화하는 응답.
+
+    라우트에서 이 응답 객체를 직접 반환해야 인코더를 건너뛴다.
+    """
+
+    def render(self, content):
+        return dumps(content)
@@ -0,0 +1,103 @@
+import asyncio
+import itertools
+import logging
+
+from governor import background_priority
+
+logger = logging.getLogger(__name__)
+
+
+class Prefetcher:
+    """목록 응답에 포함된 곡의 스트리밍 URL을 미리 받아 두는 백그라운드 작업자.
+
+    우선순위 값이 작을수록 먼저 처리되며 (차트 순위, 재생 순서),
+    대기 중인 작업이 max_pending을 넘으면 우선순위가 가장 낮은 작업부터 취소된다.
+    """
+
+    def __init__(self, warm, is_warm, top_k, max_pending, concurrency):
+        self._warm = warm  # async (video_id) -> None
+        self._is_warm = is_warm  # (video_id) -> bool
+        self.top_k = top_k
+        self.max_pending = max_pending
+        self.concurrency = concurrency
+        self._pending = {}  # video_id: (우선순위, 순번)
+        self._running = set()
+        self._seq = itertools.count()
+        self._wakeup = asyncio.Event()
+        self._workers = []
+        self.scheduled = 0
+        self.completed = 0
+        self.dropped = 0
+        self.failed = 0
+
+    def start(self):
+        self._workers = [asyncio.create_task(self._work()) for _ in range(self.concurrency)]
+
+    async def stop(self):
+        for worker in self._workers:
+            worker.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+        self._pending.clear()
+
+    def schedule(self, video_ids, base_priority=0):
+        """목록 상위 top_k곡을 예약 (이미 캐시된 곡은 건너뜀)"""
+        for position, video_id in enumerate(video_ids[:self.top_k]):
+            if not video_id or video_id in self._running or self._is_warm(video_id):
+                continue
+            priority = base_priority + position
+            current = self._pending.get(video_id)
+            if current is not None and current[0] <= priority:
+                continue
+            self._pending[video_id] = (priority, next(self._seq))
+            self.scheduled += 1
+        self._enforce_budget()
+        if self._pending:
+            self._wakeup.set()
+
+    def _enforce_budget(self):
+        overflow = len(self._pending) - self.max_pending
+        if overflow <= 0:
+            return
+        # 우선순위가 낮은(값이 큰) 작업부터, 같으면 나중에 들어온 작업부터 취소
+        for video_id in sorted(self._pending, key=self._pending.get, reverse=True)[:overflow]:
+            del self._pending[video_id]
+            self.dropped += 1
+
+    def _pop_next(self):
+        video_id = min(self._pending, key=self._pending.get)
+        del self._pending[video_id]
+        return video_id
+
+    async def _work(self):
+        while True:
+            if not self._pending:
+                self._wakeup.clear()
+                await self._wakeup.wait()
+                continue
+            video_id = self._pop_next()
+            if self._is_warm(video_id):
+                continue
+            self._running.add(video_id)
+            try:
+                # 미리 받기는 사용자 요청보다 낮은 우선순위로 업스트림 호출
+                with background_priority():
+                    await self._warm(video_id)
+                self.completed += 1
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                self.failed += 1
+                logger.warning("미리 받기 실패: %s", video_id, exc_info=True)
+            finally:
+                self._running.discard(video_id)
+
+    def stats(self):
+        return {
+            "pending": len(self._pending),
+            "running": len(self._running),
+            "scheduled": self.scheduled,
+            "completed": self.completed,
+            "dropped": self.dropped,
+            "failed": self.failed,
+        }
@@ -0,0 +1,53 @@
+# 실행 중에 켤 수 있는 샘플링 프로파일러
+# 일정 간격으로 모든 스레드의 스택을 수집해 collapsed stack(flamegraph) 형식으로 돌려준다
+import sys
+import threading
+import time
+from collections import Counter
+
+
+class SamplingProfiler:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._running = False
+
+    @property
+    def running(self):
+        return self._running
+
+    def sample(self, seconds, interval):
+        """seconds 동안 interval 간격으로 샘플링 (블로킹 - 별도 스레드에서 호출)"""
+        with self._lock:
+            if self._running:
+                raise RuntimeError("profiler is already running")
+            self._running = True
+        try:
+            stacks = Counter()
+            own_thread = threading.get_ident()
+            names = {thread.ident: thread.name for thread in threading.enumerate()}
+            deadline = time.monotonic() + seconds
+            samples = 0
+            while time.monotonic() < deadline:
+                for thread_id, frame in sys._current_frames().items():
+                    if thread_id == own_thread:
+                        continue
+                    stacks[_collapse(names.get(thread_id, str(thread_id)), frame)] += 1
+                samples += 1
+                time.sleep(interval)
+            return samples, stacks
+        finally:
+            self._running = False
+
+
+def _collapse(thread_name, frame):
+    parts = []
+    while frame is not None:
+        code = frame.f_code
+        parts.append(f"{code.co_name} ({code.co_filename.rsplit('/', 1)[-1]}:{frame.f_lineno})")
+        frame = frame.f_back
+    parts.append(thread_name)
+    return ";".join(reversed(parts))
+
+
+def render_collapsed(stacks):
+    return "\n".join(f"{stack} {count}" for stack, count in stacks.most_common()) + "\n"
@@ -0,0 +1,117 @@
+# /api/stream/{video_id} - 스트리밍 URL의 오디오를 서버가 대신 받아 전달하는 프록시
+import logging
+
+from fastapi import HTTPException
+from fastapi.responses import StreamingResponse
+
+logger = logging.getLogger(__name__)
+
+# 업스트림 응답에서 클라이언트로 그대로 전달하는 헤더
+FORWARD_HEADERS = ("content-type", "content-length", "content-range", "accept-ranges", "last-modified")
+
+# 서명된 URL이 만료되었거나 다른 IP용일 때 googlevideo가 돌려주는 상태 코드
+EXPIRED_STATUS = (403, 410)
+
+# yt-dlp가 헤더를 주지 않았을 때(이전에 캐시된 항목 등)만 사용
+DEFAULT_USER_AGENT = (
+    "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) "
+    "Chrome/120.0.0.0 Safari/537.36"
+)
+
+
+class StreamProxy:
+    """오디오를 chunk_size 단위로 받아 바로 전달하는 프록시.
+
+    resolve(video_id)는 (스트리밍 URL, yt-dlp가 준 HTTP 헤더)를 돌려주고(url_cache 경로),
+    invalidate(video_id)는 캐시된 URL만 버린다. 서명된 URL은 추출할 때와 같은 헤더(User-Agent 등)로
+    요청해야 하므로 그 헤더를 그대로 보낸다. 업스트림이 403/410을 주면 URL을 다시 받아 한 번 재시도한다.
+    Range 헤더는 그대로 업스트림에 전달하므로 탐색(seek)은 206 응답으로 처리된다.
+    연결당 메모리는 청크 하나 크기로 유지되고, httpx 클라이언트는 처음 사용할 때 만들어
+    keep-alive 연결을 모든 요청이 함께 쓴다.
+    """
+
+    def __init__(self, resolve, invalidate, chunk_size=65536, max_connections=100, timeout=30):
+        self.resolve = resolve
+        self.invalidate = invalidate
+        self.chunk_size = chunk_size
+        self.max_connections = max_connections
+        self.timeout = timeout
+        self._client = None
+        self.active = 0
+        self.reresolved = 0
+        self.bytes_sent = 0
+
+    @property
+    def client(self):
+        if self._client is None:
+            import httpx
+
+            self._client = httpx.AsyncClient(
+                limits=httpx.Limits(
+                    max_connections=self.max_connections,
+                    max_keepalive_connections=self.max_connections
+                ),
+                timeout=httpx.Timeout(self.timeout, connect=10),
+                follow_redirects=True
+            )
+        return self._client
+
+    async def close(self):
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    async def _send(self, url, http_headers, range_header):
+        headers = dict(http_headers) if http_headers else {"User-Agent": DEFAULT_USER_AGENT}
+        if range_header:
+            headers["Range"] = range_header
+        request = self.client.build_request("GET", url, headers=headers)
+        return await self.client.send(request, stream=True)
+
+    async def open(self, video_id, range_header=None):
+        url, http_headers = await self.resolve(video_id)
+        if not url:
+            raise HTTPException(status_code=404, detail=f"스트리밍 URL을 찾을 수 없습니다: {video_id}")
+
+        response = await self._send(url, http_headers, range_header)
+        if response.status_code in EXPIRED_STATUS:
+            # 만료되었거나 다른 IP용으로 서명된 URL - 캐시를 버리고 다시 추출
+            await response.aclose()
+            self.invalidate(video_id)
+            self.reresolved += 1
+            url, http_headers = await self.resolve(video_id)
+            if not url:
+                raise HTTPException(status_code=404, detail=f"스트리밍 URL을 찾을 수 없습니다: {video_id}")
+            response = await self._send(url, http_headers, range_header)
+
+        if response.status_code >= 400 and response.status_code != 416:
+            await response.aclose()
+            logger.warning("스트림 프록시 업스트림 오류 (%s): %d", video_id, response.status_code)
+            raise HTTPException(status_code=502, detail=f"스트림을 가져오지 못했습니다: {response.status_code}")
+
+        headers = {name: response.headers[name] for name in FORWARD_HEADERS if name in response.headers}
+        headers["cache-control"] = "private, no-store"
+        return StreamingResponse(
+            self._relay(response),
+            status_code=response.status_code,
+            headers=headers
+        )
+
+    async def _relay(self, response):
+        self.active += 1
+        try:
+            # aiter_raw: 업스트림 본문을 디코딩하지 않고 청크 단위로 그대로 전달
+            async for chunk in response.aiter_raw(self.chunk_size):
+                self.bytes_sent += len(chunk)
+                yield chunk
+        finally:
+            self.active -= 1
+            await response.aclose()
+
+    def stats(self):
+        return {
+            "active": self.active,
+            "reresolved": self.reresolved,
+            "bytesSent": self.bytes_sent,
+            "pool": self._client is not None,
+        }
@@ -0,0 +1,133 @@
+import bisect
+import time
+import unicodedata
+
+from cache import TTLCache
+
+
+# 한글 호환 자모(ㄱ, ㅏ - 입력 중에 혼자 쓰인 자모)를 첫소리/가운뎃소리 자모로
+_INITIALS = "ㄱㄲㄴㄷㄸㄹㅁㅂㅃㅅㅆㅇㅈㅉㅊㅋㅌㅍㅎ"
+_VOWELS = "ㅏㅐㅑㅒㅓㅔㅕㅖㅗㅘㅙㅚㅛㅜㅝㅞㅟㅠㅡㅢㅣ"
+_COMPAT_JAMO = str.maketrans(
+    {letter: chr(0x1100 + i) for i, letter in enumerate(_INITIALS)}
+    | {letter: chr(0x1161 + i) for i, letter in enumerate(_VOWELS)}
+)
+
+# 입력 중인 마지막 글자의 받침은 다음 글자의 첫소리일 수 있다 ('앙' -> '아이').
+# 받침 -> (남는 받침, 첫소리). 겹받침은 뒤 자음만 첫소리로 넘긴다 ('앉' -> '안자')
+_FINALS = "ㄱㄲㄳㄴㄵㄶㄷㄹㄺㄻㄼㄽㄾㄿㅀㅁㅂㅄㅅㅆㅇㅈㅊㅋㅌㅍㅎ"
+_SPLIT_FINALS = {
+    "ㄳ": "ㄱㅅ", "ㄵ": "ㄴㅈ", "ㄶ": "ㄴㅎ", "ㄺ": "ㄹㄱ", "ㄻ": "ㄹㅁ", "ㄼ": "ㄹㅂ",
+    "ㄽ": "ㄹㅅ", "ㄾ": "ㄹㅌ", "ㄿ": "ㄹㅍ", "ㅀ": "ㄹㅎ", "ㅄ": "ㅂㅅ",
+}
+_FOLD_FINAL = {}
+for _i, _letter in enumerate(_FINALS):
+    _rest, _initial = _SPLIT_FINALS.get(_letter, " " + _letter)
+    _FOLD_FINAL[chr(0x11A8 + _i)] = (
+        (chr(0x11A8 + _FINALS.index(_rest)) if _rest != " " else "") + _initial.translate(_COMPAT_JAMO)
+    )
+
+
+def normalize_query(query):
+    """캐시 키용 검색어 정규화 (유니코드 NFKC, 소문자, 공백 정리)"""
+    return " ".join(unicodedata.normalize("NFKC", query).lower().split())
+
+
+def jamo_key(text):
+    """접두사 색인 키 - 정규화한 뒤 한글 음절을 자모로 분해 (NFD)"""
+    return unicodedata.normalize("NFD", normalize_query(text)).translate(_COMPAT_JAMO)
+
+
+def query_prefixes(query):
+    """검색어로 찾을 색인 접두사들 - 마지막 받침을 다음 글자 첫소리로 본 접두사도 포함"""
+    key = jamo_key(query)
+    if not key:
+        return []
+    folded = _FOLD_FINAL.get(key[-1])
+    if folded is None:
+        return [key]
+    return [key, key[:-1] + folded]
+
+
+class SuggestionIndex:
+    """검색어 추천용 접두사 색인.
+
+    업스트림 추천 응답은 정규화된 검색어 그대로 TTL 캐시에 저장하고,
+    응답에 나온 추천어와 실제 검색어는 자모로 분해한 키로 정렬된 용어 목록에 모아 둔다.
+    캐시에 없는 접두사라도 색인에서 min_results개 이상 찾으면 업스트림 없이 응답한다.
+    한글은 자모 단위로 비교하므로 입력 중인 'ㅇ', '앙', '아ㅇ'도 '아이유'와 맞는다.
+    """
+
+    def __init__(self, max_terms, ttl, min_results=5):
+        self.max_terms = max_terms
+        self.ttl = ttl
+        self.min_results = min_results
+        self._responses = TTLCache(max_entries=max_terms, default_ttl=ttl)
+        self._terms = {}  # 용어 키(jamo_key): [표시 문자열, 점수, 만료 시각]
+        self._sorted = []  # 용어 키 (정렬)
+        self.prefix_hits = 0
+
+    def lookup(self, query, limit=10):
+        key = normalize_query(query)
+        if not key:
+            return []
+        cached = self._responses.get(key)
+        if cached is not None:
+            return cached
+
+        now = time.time()
+        matches = []
+        # 접두사들은 마지막 자모가 서로 달라 같은 용어가 두 번 나오지 않는다
+        for prefix in query_prefixes(query):
+            index = bisect.bisect_left(self._sorted, prefix)
+            while index < len(self._sorted) and self._sorted[index].startswith(prefix):
+                display, score, expires_at = self._terms[self._sorted[index]]
+                if expires_at > now:
+                    matches.append((score, display))
+                index += 1
+        if len(matches) < self.min_results:
+            return None
+        self.prefix_hits += 1
+        matches.sort(key=lambda match: -match[0])
+        return [display for _, display in matches[:limit]]
+
+    def add_response(self, query, suggestions):
+        key = normalize_query(query)
+        if not key:
+            return
+        self._responses.set(key, suggestions)
+        for suggestion in suggestions:
+            if isinstance(suggestion, str):
+                self.add_term(suggestion)
+
+    def add_term(self, term, weight=1):
+        key = jamo_key(term)
+        if not key:
+            return
+        expires_at = time.time() + self.ttl
+        entry = self._terms.get(key)
+        if entry is not None:
+            entry[1] += weight
+            entry[2] = expires_at
+            return
+        self._terms[key] = [term.strip(), weight, expires_at]
+        bisect.insort(self._sorted, key)
+        if len(self._terms) > self.max_terms:
+            self._evict()
+
+    def _evict(self):
+        # 만료된 용어와, 점수가 낮은 용어부터 10%를 제거하고 정렬 목록을 다시 만든다
+        now = time.time()
+        for key in [key for key, (_, _, expires_at) in self._terms.items() if expires_at <= now]:
+            del self._terms[key]
+        overflow = len(self._terms) - int(self.max_terms * 0.9)
+        if overflow > 0:
+            for key in sorted(self._terms, key=lambda key: self._terms[key][1])[:overflow]:
+                del self._terms[key]
+        self._sorted = sorted(self._terms)
+
+    def stats(self):
+        stats = self._responses.stats()
+        stats["terms"] = len(self._terms)
+        stats["prefixHits"] = self.prefix_hits
+        return stats
@@ -0,0 +1,105 @@
+import re
+import sys
+from collections import OrderedDict
+from dataclasses import dataclass
+
+# 목록 응답의 썸네일은 작은 크기(w120-h120 등)라 곡 상세용으로 크기만 바꿔 사용
+_THUMBNAIL_SIZE_RE = re.compile(r"=w\d+-h\d+")
+SONG_THUMBNAIL_SIZE = "=w544-h544"
+
+
+@dataclass(slots=True)
+class TrackMetadata:
+    """곡 상세 응답에 쓰는 메타데이터 (duration은 초 단위 문자열, /api/songs 형식)"""
+    title: str
+    artist: str
+    thumbnail: str
+    duration: str
+
+    def is_complete(self):
+        return bool(self.title and self.artist != "Unknown Artist" and self.thumbnail and self.duration != "0")
+
+
+def duration_seconds(duration):
+    """'3:45', '1:02:03' 형식을 초 단위 문자열로 (알 수 없으면 '0')"""
+    try:
+        seconds = 0
+        for part in duration.split(":"):
+            seconds = seconds * 60 + int(part)
+        return str(seconds)
+    except (AttributeError, ValueError):
+        return "0"
+
+
+def song_thumbnail(url):
+    if "googleusercontent.com" in url:
+        return _THUMBNAIL_SIZE_RE.sub(SONG_THUMBNAIL_SIZE, url)
+    return url
+
+
+class TrackIndex:
+    """검색/차트/플레이리스트 응답에서 모은 videoId별 곡 메타데이터 (LRU, 최대 max_entries개).
+
+    같은 곡이 여러 목록에 나와도 항목은 하나이고, 비어 있던 필드만 채운다.
+    /api/songs는 여기서 메타데이터를 찾으면 get_song 호출 없이 스트림 추출만 한다.
+    """
+
+    def __init__(self, max_entries):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get(self, video_id):
+        entry = self._entries.get(video_id)
+        if entry is None:
+            self.misses += 1
+            return None
+        self._entries.move_to_end(video_id)
+        self.hits += 1
+        return entry
+
+    def add_tracks(self, tracks):
+        for track in tracks:
+            if track.videoId:
+                self._add(track)
+
+    def _add(self, track):
+        entry = self._entries.get(track.videoId)
+        if entry is None:
+            self._entries[track.videoId] = TrackMetadata(
+                title=track.title,
+                # 같은 아티스트 이름은 여러 곡에서 한 문자열을 공유
+                artist=sys.intern(track.artist),
+                thumbnail=song_thumbnail(track.thumbnail),
+                duration=duration_seconds(track.duration)
+            )
+            if len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+            return
+        self._entries.move_to_end(track.videoId)
+        if not entry.is_complete():
+            if not entry.title:
+                entry.title = track.title
+            if entry.artist == "Unknown Artist":
+                entry.artist = sys.intern(track.artist)
+            if not entry.thumbnail:
+                entry.thumbnail = song_thumbnail(track.thumbnail)
+            if entry.duration == "0":
+                entry.duration = duration_seconds(track.duration)
+
+    def stats(self):
+        total = self.hits + self.misses
+        return {
+            "size": len(self._entries),
+            "maxEntries": self.max_entries,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hitRatio": round(self.hits / total, 4) if total else 0.0,
+            "evictions": self.evictions,
+        }
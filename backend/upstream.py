@@ -0,0 +1,260 @@
+import asyncio
+import functools
+import multiprocessing
+import re
+import sys
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from contextlib import asynccontextmanager
+
+import config
+import ytdlp_worker
+import metrics
+from governor import CircuitBreaker, Governor
+
+# YTMusic 클라이언트는 처음 사용할 때 만든다 (import/워커 부팅 시간 단축)
+_ytmusic = None
+_ytmusic_lock = threading.Lock()
+
+
+def get_ytmusic():
+    global _ytmusic
+    if _ytmusic is None:
+        with _ytmusic_lock:
+            if _ytmusic is None:
+                from ytmusicapi import YTMusic
+                _ytmusic = YTMusic("browser.json", language="ko")
+    return _ytmusic
+
+
+# as_mobile()로 클라이언트 context를 잠시 바꾸는 호출(타임스탬프 가사) 전용 클라이언트.
+# ytmusicapi는 as_mobile()이 스레드 안전하지 않다고 명시하므로 공유 클라이언트 대신 스레드마다 하나씩 쓴다
+_mobile_local = threading.local()
+
+
+def get_mobile_ytmusic():
+    ytmusic = getattr(_mobile_local, "ytmusic", None)
+    if ytmusic is None:
+        from ytmusicapi import YTMusic
+        ytmusic = _mobile_local.ytmusic = YTMusic("browser.json", language="ko")
+    return ytmusic
+
+
+def _uses_mobile_context(method, kwargs):
+    return method == "get_lyrics" and kwargs.get("timestamps")
+
+# yt-dlp 옵션
+ydl_opts = {
+    'format': 'bestaudio/best',
+    'quiet': True,
+    'no_warnings': True,
+    'noplaylist': True,
+    'extract_flat': False,
+    'cachedir': '/tmp/yt-dlp-cache',
+    'age_limit': None,
+    'nocheckcertificate': True,
+}
+
+
+class UpstreamPool:
+    """블로킹 업스트림 호출을 이벤트 루프 밖의 스레드 풀에서 실행한다."""
+
+    def __init__(self, name, max_workers):
+        self.name = name
+        self.max_workers = max_workers
+        self.pending = 0
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix=name)
+
+    async def run(self, fn, *args, **kwargs):
+        loop = asyncio.get_running_loop()
+        self.pending += 1
+        try:
+            return await loop.run_in_executor(self._executor, functools.partial(fn, *args, **kwargs))
+        finally:
+            self.pending -= 1
+
+    def shutdown(self):
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+    def stats(self):
+        return {"workers": self.max_workers, "pending": self.pending}
+
+
+class ThreadExtractionEngine(UpstreamPool):
+    """스레드 풀 기반 yt-dlp 추출 (YTDLP_ENGINE=thread)"""
+
+    async def extract(self, video_id):
+        return await self.run(ytdlp_worker.extract, video_id, ydl_opts)
+
+    async def warm(self):
+        await asyncio.gather(*[self.run(ytdlp_worker.warm, ydl_opts) for _ in range(self.max_workers)])
+
+
+class ProcessExtractionEngine:
+    """워커 프로세스 풀 기반 yt-dlp 추출 (YTDLP_ENGINE=process).
+
+    플레이어 JS 파싱과 서명 해결은 CPU를 많이 쓰므로 프로세스로 나눠 GIL을 피한다.
+    각 워커는 자체 YoutubeDL을 미리 만들어 두고, max_jobs_per_worker개 작업 후 교체된다.
+    작업이 시간 초과되거나 워커가 죽으면 풀 전체를 새로 만든다.
+    """
+
+    def __init__(self, name, max_workers, max_jobs_per_worker, timeout):
+        self.name = name
+        self.max_workers = max_workers
+        self.max_jobs_per_worker = max_jobs_per_worker
+        self.timeout = timeout
+        self.pending = 0
+        self.completed = 0
+        self.failed = 0
+        self.timeouts = 0
+        self.restarts = 0
+        self._pool = self._new_pool()
+
+    def _new_pool(self):
+        options = {}
+        # max_tasks_per_child는 Python 3.11부터 지원 - 그 전 버전에서는 워커를 교체하지 않는다
+        if sys.version_info >= (3, 11):
+            options["max_tasks_per_child"] = self.max_jobs_per_worker or None
+        return ProcessPoolExecutor(
+            max_workers=self.max_workers,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=ytdlp_worker.warm,
+            initargs=(ydl_opts,),
+            **options
+        )
+
+    async def extract(self, video_id):
+        self.pending += 1
+        try:
+            # 워커가 죽어서 실패한 경우 새 풀에서 한 번 더 시도
+            for attempt in range(2):
+                pool = self._pool
+                try:
+                    future = asyncio.wrap_future(pool.submit(ytdlp_worker.extract, video_id, ydl_opts))
+                    result = await asyncio.wait_for(future, self.timeout)
+                except BrokenProcessPool:
+                    self._restart(pool)
+                    if attempt == 0:
+                        continue
+                    raise
+                except asyncio.TimeoutError:
+                    # 멈춘 워커는 종료시켜야 하므로 풀을 교체
+                    self.timeouts += 1
+                    self._restart(pool)
+                    raise
+                self.completed += 1
+                return result
+        except Exception:
+            self.failed += 1
+            raise
+        finally:
+            self.pending -= 1
+
+    async def warm(self):
+        """워커 프로세스를 모두 띄우고 YoutubeDL을 미리 생성"""
+        await asyncio.gather(*[
+            asyncio.wrap_future(self._pool.submit(ytdlp_worker.warm, ydl_opts)) for _ in range(self.max_workers)
+        ])
+
+    def _restart(self, pool):
+        if pool is not self._pool:
+            return  # 이미 다른 작업이 교체함
+        self.restarts += 1
+        self._pool = self._new_pool()
+        for process in list((pool._processes or {}).values()):
+            process.terminate()
+        pool.shutdown(wait=False, cancel_futures=True)
+
+    def shutdown(self):
+        self._pool.shutdown(wait=False, cancel_futures=True)
+
+    def stats(self):
+        return {
+            "workers": self.max_workers,
+            "pending": self.pending,
+            "completed": self.completed,
+            "failed": self.failed,
+            "timeouts": self.timeouts,
+            "restarts": self.restarts,
+        }
+
+
+# 메타데이터(ytmusicapi)와 스트림 추출(yt-dlp)은 서로 다른 풀을 사용
+metadata_pool = UpstreamPool("ytmusic", config.YTMUSIC_WORKERS)
+if config.YTDLP_ENGINE == "process":
+    extract_pool = ProcessExtractionEngine(
+        "ytdlp", config.YTDLP_WORKERS,
+        max_jobs_per_worker=config.YTDLP_MAX_JOBS_PER_WORKER,
+        timeout=config.YTDLP_JOB_TIMEOUT
+    )
+else:
+    extract_pool = ThreadExtractionEngine("ytdlp", config.YTDLP_WORKERS)
+
+
+def _breaker():
+    return CircuitBreaker(
+        threshold=config.BREAKER_THRESHOLD,
+        min_calls=config.BREAKER_MIN_CALLS,
+        window=config.BREAKER_WINDOW,
+        cooldown=config.BREAKER_COOLDOWN
+    )
+
+
+# 업스트림별 호출 제어 (속도 제한, 적응형 동시 실행 한도, 서킷 브레이커, 우선순위)
+ytmusic_governor = Governor(
+    "ytmusic", config.YTMUSIC_RATE, config.YTMUSIC_BURST, config.YTMUSIC_WORKERS, _breaker()
+)
+ytdlp_governor = Governor(
+    "ytdlp", config.YTDLP_RATE, config.YTDLP_BURST, config.YTDLP_WORKERS, _breaker()
+)
+
+
+def _call_ytmusic(method, *args, **kwargs):
+    client = get_mobile_ytmusic() if _uses_mobile_context(method, kwargs) else get_ytmusic()
+    return getattr(client, method)(*args, **kwargs)
+
+
+@asynccontextmanager
+async def _governed(governor, call):
+    # 호출 시간에는 실제 호출만 넣고, 한도/속도 제한 대기는 따로 기록한다
+    queued = time.perf_counter()
+    async with governor.guard(call):
+        metrics.upstream_wait.observe(call, value=time.perf_counter() - queued)
+        with metrics.time_upstream(call):
+            yield
+
+
+async def call_ytmusic(method, *args, **kwargs):
+    """ytmusic.<method>(*args, **kwargs)를 메타데이터 풀에서 실행"""
+    async with _governed(ytmusic_governor, method):
+        return await metadata_pool.run(_call_ytmusic, method, *args, **kwargs)
+
+
+async def extract_info(video_id):
+    """yt-dlp로 스트리밍 정보를 추출 (추출 풀에서 실행)"""
+    async with _governed(ytdlp_governor, "extract_info"):
+        return await extract_pool.extract(video_id)
+
+
+async def warm_up():
+    """YTMusic 클라이언트와 추출 워커를 만들고, 한 번 추출해서 플레이어 JS/서명 캐시를 채운다"""
+    await metadata_pool.run(get_ytmusic)
+    await extract_pool.warm()
+    if config.WARMUP_VIDEO_ID:
+        await extract_info(config.WARMUP_VIDEO_ID)
+
+
+def shutdown():
+    metadata_pool.shutdown()
+    extract_pool.shutdown()
+
+
+_EXPIRE_RE = re.compile(r"[?&/]expire[=/](\d+)")
+
+
+def stream_url_expiry(url):
+    """서명된 googlevideo URL의 expire 파라미터(epoch 초)를 읽는다. 없으면 None"""
+    match = _EXPIRE_RE.search(url or "")
+    return int(match.group(1)) if match else None
@@ -0,0 +1,43 @@
+# yt-dlp 추출 작업 함수
+# 추출 워커 프로세스에서도 import되므로 무거운 모듈은 가져오지 않는다
+# yt_dlp(추출기 목록 포함)는 import 비용이 커서 처음 추출할 때 가져온다
+import threading
+
+# YoutubeDL 인스턴스는 스레드 간에 공유하면 안전하지 않으므로
+# 스레드(프로세스 워커에서는 프로세스)마다 하나씩 만들어 재사용한다
+_local = threading.local()
+
+# 호출하는 쪽에서 사용하는 필드만 남겨서 반환 (프로세스 간 전송량 감소)
+INFO_FIELDS = ('url', 'title', 'thumbnail', 'duration', 'uploader', 'http_headers')
+
+
+class ExtractionError(Exception):
+    """워커 프로세스에서 부모로 전달할 수 있는 추출 오류.
+
+    yt-dlp 예외는 YoutubeDL 로거 등을 참조하고 있어 pickle할 수 없으므로 메시지만 옮긴다.
+    """
+
+
+def get_ydl(opts):
+    ydl = getattr(_local, "ydl", None)
+    if ydl is None:
+        import yt_dlp
+        ydl = yt_dlp.YoutubeDL(opts)
+        _local.ydl = ydl
+    return ydl
+
+
+def warm(opts):
+    """워커 시작 시 YoutubeDL 인스턴스를 미리 생성"""
+    get_ydl(opts)
+
+
+def extract(video_id, opts):
+    youtube_url = f"https://music.youtube.com/watch?v={video_id}"
+    try:
+        info = get_ydl(opts).extract_info(youtube_url, download=False)
+    except Exception as e:
+        raise ExtractionError(f"{type(e).__name__}: {e}") from None
+    if not info:
+        return None
+    return {field: info.get(field) for field in INFO_FIELDS}